@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from exifgeek import ExifTool, InjectionEngine, default_workers
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exiftool_src', 't', 'images')
+
+# Source image and target sample per format, from ExifTool's test images
+SOURCE = 'Canon.jpg'
+FORMATS = {
+    'jpg': 'Nikon.jpg',
+    'tif': 'ExifTool.tif',
+    'png': 'PNG.png',
+    'cr2': 'CanonRaw.cr2',
+    'dng': 'DNG.dng',
+    'mov': 'QuickTime.mov',
+}
+
+
+def make_batch(directory, sample, count):
+    ext = os.path.splitext(sample)[1]
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f'{i:06d}{ext}')
+        shutil.copyfile(os.path.join(IMAGES_DIR, sample), path)
+        paths.append(path)
+    return paths
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def peak_rss_mb(who):
+    rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def summarize(name, fmt, count, elapsed, latencies):
+    return {
+        'bench': name,
+        'format': fmt,
+        'files': count,
+        'seconds': round(elapsed, 3),
+        'files_per_sec': round(count / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'peak_rss_mb': round(peak_rss_mb(resource.RUSAGE_SELF), 1),
+        'peak_exiftool_rss_mb': round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+class BenchFailed(Exception):
+    pass
+
+
+def check(failures, count):
+    # failures: [(path, message)]
+    if failures:
+        path, message = failures[0]
+        raise BenchFailed(f"{len(failures)} of {count} files failed, first {path}: {message}")
+
+
+def bench_read(paths):
+    with ExifTool() as exiftool:
+        exiftool.get_metadata(paths[0]) # Warm up so Perl startup isn't timed
+        latencies = []
+        failures = []
+        start = time.perf_counter()
+        for path in paths:
+            t = time.perf_counter()
+            meta = exiftool.get_metadata(path)
+            latencies.append(time.perf_counter() - t)
+            if 'Error' in meta:
+                failures.append((path, meta['Error']))
+        elapsed = time.perf_counter() - start
+    check(failures, len(paths))
+    return elapsed, latencies
+
+
+def bench_copy(src, paths, warmups):
+    with ExifTool() as exiftool:
+        exiftool.copy_metadata(src, warmups[0]) # Also loads the writer modules
+        latencies = []
+        failures = []
+        start = time.perf_counter()
+        for path in paths:
+            t = time.perf_counter()
+            ok, message = exiftool.copy_metadata(src, path)
+            latencies.append(time.perf_counter() - t)
+            if not ok:
+                failures.append((path, message))
+        elapsed = time.perf_counter() - start
+    check(failures, len(paths))
+    return elapsed, latencies
+
+
+def bench_pipeline(src, paths, warmups, workers):
+    # Same engine run_injection drives; latency is the time ExifTool spent
+    # on each file as the engine reports it
+    with ExifTool(size=workers) as exiftool:
+        engine = InjectionEngine(exiftool, workers=workers)
+        # One warmup file per worker, so no file is written twice at once
+        engine.run(src, warmups)
+        start = time.perf_counter()
+        results = engine.run(src, paths)
+        elapsed = time.perf_counter() - start
+    check([(r.path, r.message) for r in results if not r.ok], len(paths))
+    return elapsed, [r.elapsed for r in results if r.elapsed is not None]
+
+
+def run_one(name, fmt, count, workers):
+    """Run one bench in this process and return its summary row."""
+    with tempfile.TemporaryDirectory(prefix='exifgeek-bench-') as tmp:
+        src = os.path.join(tmp, SOURCE)
+        shutil.copyfile(os.path.join(IMAGES_DIR, SOURCE), src)
+        paths = make_batch(tmp, FORMATS[fmt], count)
+        warmups = make_batch(tempfile.mkdtemp(dir=tmp), FORMATS[fmt], max(1, workers))
+        if name == 'read':
+            elapsed, latencies = bench_read(paths)
+        elif name == 'copy':
+            elapsed, latencies = bench_copy(src, paths, warmups)
+        else:
+            elapsed, latencies = bench_pipeline(src, paths, warmups, workers)
+    return summarize(name, fmt, count, elapsed, latencies)
+
+
+def spawn(name, fmt, count, workers):
+    # ru_maxrss is a peak over the whole process, so each bench gets a
+    # fresh interpreter of its own; returns (row, error)
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--one', name, fmt, str(count),
+                           '--workers', str(workers)], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exited with status {proc.returncode}"
+    return json.loads(proc.stdout), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure ExifGeek read and inject throughput.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--formats', nargs='+', default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument('--benches', nargs='+', default=['read', 'copy', 'pipeline'],
+                        choices=['read', 'copy', 'pipeline'])
+    parser.add_argument('--workers', type=int, default=default_workers())
+    parser.add_argument('--json', action='store_true', help='print one JSON object per result')
+    # Internal: run a single bench and print its row as JSON
+    parser.add_argument('--one', nargs=3, metavar=('BENCH', 'FORMAT', 'FILES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Use the bundled ExifTool, as the .app does
+    os.environ.setdefault('RESOURCEPATH', os.path.dirname(os.path.abspath(__file__)))
+
+    if args.one:
+        name, fmt, count = args.one
+        try:
+            row = run_one(name, fmt, int(count), args.workers)
+        except BenchFailed as e:
+            sys.exit(str(e))
+        print(json.dumps(row))
+        return
+
+    if not args.json:
+        print(f"{'bench':<9}{'format':<7}{'files':>7}{'files/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+              f"{'rss MB':>8}{'exiftool MB':>13}")
+    failed = 0
+    for fmt in args.formats:
+        for count in args.sizes:
+            for name in args.benches:
+                row, error = spawn(name, fmt, count, args.workers)
+                if error:
+                    failed += 1
+                    print(f"{name} {fmt} {count}: FAILED: {error}", file=sys.stderr, flush=True)
+                elif args.json:
+                    print(json.dumps(row), flush=True)
+                else:
+                    print(f"{name:<9}{fmt:<7}{count:>7}{row['files_per_sec']:>10}{row['p50_ms']:>9}"
+                          f"{row['p99_ms']:>9}{row['peak_rss_mb']:>8}{row['peak_exiftool_rss_mb']:>13}",
+                          flush=True)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
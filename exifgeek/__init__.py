@@ -0,0 +1,12 @@
+from .metadata import Metadata, Tag
+from .exiftool import ExifTool, ExifToolError, ExifToolProcess
+from .aio import AsyncExifTool
+from .engine import InjectionEngine, InjectionResult, default_workers
+from .snapshot import SnapshotCache
+from .scan import iter_files
+from .prefilter import classify, split_writable
+from .state import StateDB, FingerprintCache, source_fingerprint
+from .profiles import Profile, DEFAULT_PROFILE, available_profiles, get_profile
+from .journal import Journal
+from .splice import SpliceSource, SpliceUnsupported, splice_metadata
+from .results import ResultStore, result_status, result_matches
@@ -0,0 +1,323 @@
+import asyncio
+import itertools
+
+from .exiftool import (ExifTool, ExifToolError, ExifToolTimeout, FILE_HEADER, TIMEOUT, TIMEOUT_PER_MB,
+                       argfile_line, attribute_messages, fast_args, file_timeout, first_error,
+                       parse_write_results, quarantine_message, tag_args, SOURCE_TIMED_OUT)
+from .metadata import Metadata, parse_json
+
+# Requests in flight over all sessions before further callers wait
+CONCURRENCY = 64
+
+
+class _Command:
+    """One pipelined command and what ExifTool has answered to it so far."""
+
+    def __init__(self, seq, lines, deadlines, future):
+        self.seq = seq
+        self.marker = f'{{ready{seq}}}'.encode('ascii')
+        self.lines = lines
+        self.deadlines = deadlines
+        self.future = future
+        self.reset()
+
+    def reset(self):
+        self.out = bytearray()
+        self.err = bytearray()
+        self.out_done = False
+        self.err_done = False
+        self.headers = 0
+        self.started = None
+
+    @property
+    def deadline(self):
+        if not self.deadlines or self.started is None:
+            return None
+        return self.started + self.deadlines[min(max(self.headers - 1, 0), len(self.deadlines) - 1)]
+
+
+class AsyncExifToolProcess:
+    """One `exiftool -stay_open True -@ -` session driven from the event loop.
+
+    Commands are pipelined: each is written to stdin as soon as it is
+    submitted and ExifTool runs them in order, so replies are matched to
+    their commands by the `{ready<N>}` markers on stdout and stderr. A
+    watchdog task gives the command at the head of the line its
+    deadlines, counted per file by `-v0` headers like
+    ExifToolProcess.execute(). Killing a stuck command restarts the
+    session and sends the commands queued behind it again.
+    """
+
+    def __init__(self, cmd_prefix):
+        self.cmd_prefix = cmd_prefix
+        self.proc = None
+        # seq -> _Command, in the order ExifTool will run them
+        self.commands = {}
+        self._ids = itertools.count(1)
+        self._readers = []
+        # Output not yet matched to a finished command, per stream
+        self._bufs = {}
+        self._watchdog_task = None
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self):
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            *self.cmd_prefix, '-stay_open', 'True', '-@', '-',
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        self._bufs = {'out': bytearray(), 'err': bytearray()}
+        self._readers = [asyncio.ensure_future(self._read(self.proc.stdout, 'out')),
+                         asyncio.ensure_future(self._read(self.proc.stderr, 'err'))]
+        if self._watchdog_task is None or self._watchdog_task.done():
+            self._watchdog_task = asyncio.ensure_future(self._watchdog())
+        for command in self.commands.values():
+            command.reset()
+            self._write(command)
+        await self.proc.stdin.drain()
+
+    async def execute(self, *args, deadlines=None):
+        """Run one command and return its decoded (stdout, stderr)."""
+        async with self._lock:
+            if not self.running:
+                await self.start()
+        seq = next(self._ids)
+        ready = f'{{ready{seq}}}'
+        lines = [argfile_line(a) for a in args] + ['-echo4', ready, f'-execute{seq}']
+        command = _Command(seq, lines, deadlines, asyncio.get_running_loop().create_future())
+        self.commands[seq] = command
+        self._write(command)
+        self._wake.set()
+        await self.proc.stdin.drain()
+        out, err = await command.future
+        return out.decode('utf-8', 'replace'), err.decode('utf-8', 'replace')
+
+    def _write(self, command):
+        self.proc.stdin.write(('\n'.join(command.lines) + '\n').encode('utf-8'))
+
+    def _head(self, part):
+        # The oldest command still waiting for output on stream `part`
+        for command in self.commands.values():
+            if not getattr(command, part + '_done'):
+                return command
+        return None
+
+    async def _read(self, stream, part):
+        buf = self._bufs[part]
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                # Wait for the exit so that `running` is False before
+                # failing, or a command sent meanwhile would never return
+                await self.proc.wait()
+                self._fail(ExifToolError("exiftool exited unexpectedly"))
+                return
+            buf += chunk
+            while buf:
+                command = self._head(part)
+                if command is None:
+                    # Output of a command cancelled by its caller
+                    buf.clear()
+                    break
+                end = buf.find(command.marker)
+                data = buf if end == -1 else buf[:end]
+                if part == 'out' and command.deadlines:
+                    seen = data.count(FILE_HEADER)
+                    if seen != command.headers:
+                        # The next file started, its own allowance runs from here
+                        command.headers = seen
+                        command.started = asyncio.get_running_loop().time()
+                        self._wake.set()
+                if end == -1:
+                    break
+                setattr(command, part, bytearray(data))
+                setattr(command, part + '_done', True)
+                del buf[:end + len(command.marker)]
+                while buf[:1] in (b'\r', b'\n'):
+                    del buf[:1]
+                if command.out_done and command.err_done:
+                    self._finish(command)
+
+    def _finish(self, command):
+        del self.commands[command.seq]
+        if not command.future.done():
+            command.future.set_result((bytes(command.out), bytes(command.err)))
+        self._wake.set()
+
+    def _fail(self, error):
+        commands, self.commands = self.commands, {}
+        for command in commands.values():
+            if not command.future.done():
+                command.future.set_exception(error)
+
+    async def _watchdog(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wake.clear()
+            command = next(iter(self.commands.values()), None)
+            if command is not None and command.deadlines:
+                if command.started is None:
+                    command.started = loop.time()
+                remaining = command.deadline - loop.time()
+                if remaining <= 0:
+                    await self._timed_out(command, loop.time() - command.started)
+                    continue
+            else:
+                remaining = None
+            try:
+                await asyncio.wait_for(self._wake.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _timed_out(self, command, elapsed):
+        # What is left unmatched in the buffers is the stuck command's output
+        del self.commands[command.seq]
+        await self.kill()
+        out, err = (bytes(self._bufs[part]).decode('utf-8', 'replace') for part in ('out', 'err'))
+        if not command.future.done():
+            command.future.set_exception(ExifToolTimeout(max(command.headers - 1, 0), elapsed, out, err))
+        async with self._lock:
+            if not self.running:
+                await self.start()
+
+    async def kill(self):
+        for task in self._readers:
+            task.cancel()
+        self._readers = []
+        if self.running:
+            self.proc.kill()
+            await self.proc.wait()
+
+    async def close(self):
+        if self._watchdog_task is not None:
+            self._watchdog_task.cancel()
+            self._watchdog_task = None
+        if self.running:
+            try:
+                self.proc.stdin.write(b'-stay_open\nFalse\n')
+                await self.proc.stdin.drain()
+                await asyncio.wait_for(self.proc.wait(), 5)
+            except Exception:
+                pass
+        await self.kill()
+        self._fail(ExifToolError("exiftool session closed"))
+
+
+class AsyncExifTool:
+    """asyncio counterpart of ExifTool over up to `size` sessions.
+
+    Any number of coroutines may await read() and copy() at once. At most
+    `concurrency` requests are in flight, each sent to the session with
+    the fewest queued; the rest wait their turn. Results and failures
+    are reported like ExifTool.read_metadata() and copy_metadata_many().
+
+        async with AsyncExifTool(size=4) as exiftool:
+            metas = await asyncio.gather(*(exiftool.read(p) for p in paths))
+    """
+
+    def __init__(self, size=1, concurrency=CONCURRENCY, timeout=TIMEOUT, timeout_per_mb=TIMEOUT_PER_MB):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.timeout_per_mb = timeout_per_mb
+        # path -> message, for files that made ExifTool miss its deadline
+        self.quarantine = {}
+        self._procs = [AsyncExifToolProcess(ExifTool.get_cmd_prefix()) for _ in range(self.size)]
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def execute(self, *args, deadlines=None):
+        async with self._slots:
+            proc = min(self._procs, key=lambda p: len(p.commands))
+            return await proc.execute(*args, deadlines=deadlines)
+
+    def deadlines(self, paths):
+        if self.timeout is None:
+            return None
+        return [file_timeout(path, self.timeout, self.timeout_per_mb) for path in paths]
+
+    def _quarantine(self, path, elapsed):
+        message = quarantine_message(elapsed)
+        self.quarantine[path] = message
+        return message
+
+    async def read(self, path, fast=0, tags=None):
+        """Grouped, typed read of `path` as a Metadata, see ExifTool.read_metadata()."""
+        try:
+            out, err = await self.execute(*fast_args(fast), *tag_args(tags), '-j', '-G1', '-struct', '-a', '-l',
+                                          path, deadlines=self.deadlines([path]))
+            if out.strip():
+                records = parse_json(out)
+                if records:
+                    return records[0]
+            return Metadata(path, error=first_error(err) or "Failed to read metadata")
+        except ExifToolTimeout as e:
+            return Metadata(path, error=self._quarantine(path, e.elapsed))
+        except FileNotFoundError:
+            return Metadata(path, error="exiftool not found in PATH")
+        except Exception as e:
+            return Metadata(path, error=str(e))
+
+    async def copy(self, src, dests, tags=None, output=None):
+        """Copy metadata from `src` into `dests` with one command.
+
+        Arguments as for ExifTool.copy_metadata_many(); returns one
+        (path, ok, message, warnings) tuple per destination, in order.
+        """
+        dests = list(dests)
+        if src in self.quarantine:
+            return self._source_failed(src, dests, self.quarantine[src])
+        tags = tags or ['-all:all']
+        mode = ['-o', output] if output else ['-overwrite_original']
+        deadlines = self.deadlines(dests)
+        if deadlines:
+            # The source is read while the first target is being written
+            deadlines[0] += file_timeout(src, self.timeout, self.timeout_per_mb)
+        try:
+            out, err = await self.execute('-v0', '-TagsFromFile', src, *tags, *mode, *dests, deadlines=deadlines)
+        except ExifToolTimeout as e:
+            # Files before the stuck one were finished, the stuck one is
+            # quarantined and the rest run again
+            if e.index == 0 and src in self.quarantine:
+                # Queued before a concurrent copy found the source stuck
+                return self._source_failed(src, dests, self.quarantine[src])
+            if e.index == 0 and not await self._source_readable(src):
+                # It was the source, rerunning would stall on every target
+                return self._source_failed(src, dests, self._quarantine(src, e.elapsed))
+            finished, stuck, rest = dests[:e.index], dests[e.index], dests[e.index + 1:]
+            errors, warnings, _ = attribute_messages(finished, e.err)
+            results = [(dest, dest not in errors, errors.get(dest, "Success"), tuple(warnings.get(dest, ())))
+                       for dest in finished]
+            results.append((stuck, False, self._quarantine(stuck, e.elapsed), ()))
+            if rest:
+                results.extend(await self.copy(src, rest, tags, output))
+            return results
+        except FileNotFoundError:
+            return [(dest, False, "exiftool not found in PATH", ()) for dest in dests]
+        except Exception as e:
+            return [(dest, False, str(e), ()) for dest in dests]
+        return parse_write_results(dests, out, err)
+
+    async def _source_readable(self, src):
+        try:
+            await self.execute('-j', src, deadlines=self.deadlines([src]))
+        except ExifToolTimeout:
+            return False
+        except Exception:
+            pass
+        return True
+
+    @staticmethod
+    def _source_failed(src, dests, reason):
+        message = f"{SOURCE_TIMED_OUT}: {src} ({reason})"
+        return [(dest, False, message, ()) for dest in dests]
+
+    async def close(self):
+        await asyncio.gather(*(proc.close() for proc in self._procs))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,231 @@
+import os
+import sys
+import glob
+import json
+import argparse
+
+from .exiftool import ExifTool, TIMEOUT, TIMEOUT_PER_MB
+from .engine import InjectionEngine, default_workers
+from .scan import iter_files
+from .prefilter import classify
+from .profiles import DEFAULT_PROFILE, available_profiles
+from .snapshot import SnapshotCache
+from .state import StateDB
+from .journal import Journal, CLI_JOURNAL
+from .results import ResultStore
+
+EXIT_OK = 0
+EXIT_FAILED = 1 # Some targets failed
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+GLOB_CHARS = set('*?[')
+
+
+def expand_targets(patterns, unmatched=None):
+    """Expand globs (`**` included) and walk directories into file paths.
+
+    A file named by several patterns comes once. Globs matching nothing
+    and paths that don't exist are appended to `unmatched`; the latter
+    are still yielded, to fail like any other unreadable file.
+    """
+    seen = set()
+    for pattern in patterns:
+        if GLOB_CHARS & set(pattern):
+            paths = sorted(glob.glob(pattern, recursive=True))
+            missing = not paths
+        else:
+            paths = [pattern]
+            missing = not os.path.lexists(pattern)
+        if missing and unmatched is not None:
+            unmatched.append(pattern)
+        for path in iter_files(paths):
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                yield path
+
+
+def report_unmatched(args, unmatched):
+    for pattern in unmatched:
+        if getattr(args, 'jsonl', False):
+            emit({'event': 'unmatched', 'pattern': pattern})
+        elif not getattr(args, 'quiet', False):
+            print(f"exifgeek: no such file or no match: {pattern}", file=sys.stderr)
+
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
+def cmd_inject(args):
+    if not os.path.isfile(args.src):
+        print(f"exifgeek: source not found: {args.src}", file=sys.stderr)
+        return EXIT_USAGE
+
+    targets = []
+    skipped = 0
+    unmatched = []
+    for path in expand_targets(args.targets, unmatched):
+        reason = None if args.no_filter else classify(path)
+        if reason is None:
+            targets.append(path)
+            continue
+        skipped += 1
+        if args.jsonl:
+            emit({'event': 'skipped', 'path': path, 'reason': reason})
+        elif not args.quiet:
+            print(f"skipped [{reason}] {path}", file=sys.stderr)
+
+    # Scheduled runs must notice a target that vanished or a glob gone stale
+    report_unmatched(args, unmatched)
+    if not targets:
+        print("exifgeek: no targets to inject", file=sys.stderr)
+        return EXIT_FAILED
+    status = run_engine(args, lambda engine, progress: engine.run(args.src, targets, progress=progress),
+                        skipped)
+    return EXIT_FAILED if unmatched and status == EXIT_OK else status
+
+
+def cmd_resume(args):
+    journal = Journal(args.journal_file, name=CLI_JOURNAL)
+    if journal.load()[0] is None:
+        print(f"exifgeek: nothing to resume in {journal.path}", file=sys.stderr)
+        return EXIT_OK
+    # resume() restores the batch's own write mode
+    args.journaled = False
+    args.journal_file = journal.path
+    return run_engine(args, lambda engine, progress: engine.resume(progress=progress))
+
+
+def run_engine(args, work, skipped=0):
+    """Build an InjectionEngine from the common options and report `work(engine, progress)`."""
+    exiftool = ExifTool(size=args.workers, timeout=args.timeout or None, timeout_per_mb=args.timeout_per_mb)
+    state = StateDB(args.state) if args.only_changed or args.state else None
+    journal = Journal(args.journal_file, name=CLI_JOURNAL) if args.journaled or args.journal_file else None
+    engine = InjectionEngine(exiftool, workers=args.workers, chunk_size=args.chunk_size,
+                             snapshots=None if args.no_snapshot else SnapshotCache(exiftool),
+                             state=state, only_changed=args.only_changed, profile=args.profile,
+                             journal=journal,
+                             safe_write=args.journaled, splice=args.splice)
+
+    def progress(done, total, result):
+        if args.jsonl:
+            emit({'event': 'file', 'path': result.path, 'ok': result.ok, 'message': result.message,
+                  'warnings': list(result.warnings), 'elapsed': result.elapsed, 'size': result.size,
+                  'done': done, 'total': total})
+        elif not result.ok and not args.quiet:
+            print(f"failed {result.path}: {result.message}", file=sys.stderr)
+
+    try:
+        results = work(engine, progress)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        exiftool.close()
+        if engine.snapshots:
+            engine.snapshots.clear()
+        if state:
+            state.close()
+        if engine.journal:
+            engine.journal.close()
+
+    if args.report:
+        store = ResultStore()
+        store.add(results)
+        store.export(args.report)
+    ok = sum(1 for r in results if r.ok)
+    failed = len(results) - ok
+    if args.jsonl:
+        emit({'event': 'summary', 'total': len(results), 'ok': ok, 'failed': failed, 'skipped': skipped})
+    elif not args.quiet:
+        print(f"{ok}/{len(results)} files updated, {failed} failed, {skipped} skipped", file=sys.stderr)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_read(args):
+    exiftool = ExifTool(size=args.workers, timeout=args.timeout or None, timeout_per_mb=args.timeout_per_mb)
+    failed = 0
+    unmatched = []
+    try:
+        # Streamed, so the first files print while later ones are still read
+        paths = expand_targets(args.targets, unmatched)
+        for _, meta in exiftool.get_metadata_many(paths, tags=args.tags, fast=args.fast):
+            failed += meta.error is not None
+            emit({'SourceFile': meta.source, **meta.to_dict(numeric=args.numeric)})
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        exiftool.close()
+    report_unmatched(args, unmatched)
+    return EXIT_FAILED if failed or unmatched else EXIT_OK
+
+
+def cmd_profiles(args):
+    for profile in available_profiles():
+        print(f"{profile.name:<14} {profile.label}")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='exifgeek', description='Headless ExifGeek metadata transfer.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    watchdog = argparse.ArgumentParser(add_help=False)
+    watchdog.add_argument('--timeout', type=float, default=TIMEOUT,
+                          help='seconds ExifTool may spend on one file before it is restarted and the file '
+                               'quarantined, 0 to disable (default: %(default)s)')
+    watchdog.add_argument('--timeout-per-mb', type=float, default=TIMEOUT_PER_MB,
+                          help='extra seconds per MB of the file (default: %(default)s)')
+
+    # Options shared by every command that writes
+    common = argparse.ArgumentParser(add_help=False, parents=[watchdog])
+    common.add_argument('-j', '--workers', type=int, default=default_workers(),
+                        help='persistent ExifTool processes (default: CPU count)')
+    common.add_argument('--chunk-size', type=int, default=None, help='targets per ExifTool command')
+    common.add_argument('--state', default=None, help='state database (default: per-user data dir)')
+    common.add_argument('--journal-file', default=None,
+                        help=f'checkpoint of the batch for resume (default with --journaled: {CLI_JOURNAL} '
+                             'in the per-user data dir, separate from the window\'s)')
+    common.add_argument('--no-snapshot', action='store_true', help='always read tags from SRC itself')
+    common.add_argument('--splice', action='store_true',
+                        help="JPEG to JPEG with the full profile: splice SRC's Exif/XMP/IPTC segments in Python "
+                             "into targets without metadata of their own, ExifTool writes the others")
+    common.add_argument('--jsonl', action='store_true', help='JSON-lines progress on stdout')
+    common.add_argument('--report', default=None, help='write per-file results to a .csv or .jsonl file')
+    common.add_argument('-q', '--quiet', action='store_true')
+
+    inject = sub.add_parser('inject', parents=[common], help='copy metadata from SRC into TARGETS')
+    inject.add_argument('src')
+    inject.add_argument('targets', nargs='+', help="files, directories (walked recursively) or globs ('**' allowed)")
+    inject.add_argument('-p', '--profile', default=DEFAULT_PROFILE,
+                        choices=[p.name for p in available_profiles()])
+    inject.add_argument('--only-changed', action='store_true',
+                        help='skip targets already written from the same source metadata')
+    inject.add_argument('--journaled', action='store_true',
+                        help='write temp copies, fsync and rename them into place, logging to the journal')
+    inject.add_argument('--no-filter', action='store_true', help='do not prefilter unwritable files')
+    inject.set_defaults(func=cmd_inject)
+
+    resume = sub.add_parser('resume', parents=[common], help='finish an interrupted batch, pending and failed targets only')
+    resume.set_defaults(func=cmd_resume, profile=DEFAULT_PROFILE, only_changed=False)
+
+    read = sub.add_parser('read', parents=[watchdog], help='print the metadata of FILES as JSON lines')
+    read.add_argument('targets', nargs='+', metavar='files', help="files, directories or globs ('**' allowed)")
+    read.add_argument('-j', '--workers', type=int, default=default_workers(),
+                      help='persistent ExifTool processes (default: CPU count); output is in completion order')
+    read.add_argument('-t', '--tag', dest='tags', action='append', default=None,
+                      help='read only this tag (e.g. Model, EXIF:DateTimeOriginal), may be repeated')
+    read.add_argument('-n', '--numeric', action='store_true', help='raw values instead of print-converted ones')
+    read.add_argument('--fast', action='count', default=0, help='skip trailers (-fast), twice for -fast2')
+    read.set_defaults(func=cmd_read)
+
+    profiles = sub.add_parser('profiles', help='list injection profiles')
+    profiles.set_defaults(func=cmd_profiles)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
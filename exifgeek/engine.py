@@ -0,0 +1,293 @@
+import os
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .exiftool import ExifTool
+from .state import FingerprintCache
+from .profiles import DEFAULT_PROFILE, get_profile
+from .journal import TEMP_FORMAT, temp_path, fsync_path, commit_temp, discard_temp, WRITTEN, DONE, FAILED
+from .splice import SpliceSource, splice_metadata
+
+# `warnings` are ExifTool's warnings for the file, `elapsed` the seconds
+# ExifTool spent on it and `size` the bytes of the written file
+InjectionResult = namedtuple('InjectionResult', ['path', 'ok', 'message', 'warnings', 'elapsed', 'size'],
+                             defaults=((), None, None))
+
+CANCELLED = "Cancelled"
+UNCHANGED = "Unchanged"
+SOURCE_CHANGED = "Source metadata changed since the batch was started"
+SPLICED = "Success (JPEG splice)"
+
+# Upper bound on targets written by one ExifTool command
+MAX_CHUNK_SIZE = 64
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class InjectionEngine:
+    """Spreads metadata copies over a pool of persistent ExifTool sessions.
+
+    Targets are written in chunks: one ExifTool command per chunk reads the
+    source once and writes every target in it. Each Python worker thread
+    only feeds one ExifTool session, so the actual parallelism comes from
+    the Perl processes.
+    """
+
+    def __init__(self, exiftool=None, workers=None, chunk_size=None, snapshots=None,
+                 state=None, only_changed=False, profile=DEFAULT_PROFILE, journal=None, safe_write=False,
+                 splice=False):
+        self.workers = workers or default_workers()
+        self.exiftool = exiftool or ExifTool(size=self.workers)
+        self.chunk_size = chunk_size
+        self.snapshots = snapshots
+        self.state = state
+        self.only_changed = only_changed
+        self.profile = profile
+        # A Journal checkpoints every batch so an interrupted one can be
+        # resumed; `safe_write` also writes temp copies renamed into place
+        self.journal = journal
+        self.safe_write = safe_write
+        # Fingerprints of sources, so one injected from batch after batch
+        # isn't read again each time
+        self.fingerprints = FingerprintCache(self.exiftool)
+        # JPEG to JPEG copies of all metadata splice the source's segments
+        # in without ExifTool where splice_metadata() allows it
+        self.splice = splice
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def _chunk_size(self, total):
+        if self.chunk_size:
+            return self.chunk_size
+        # Small batches are split evenly so every worker gets a share
+        per_worker = -(-total // self.workers)
+        return max(1, min(MAX_CHUNK_SIZE, per_worker))
+
+    def run(self, src, targets, progress=None):
+        """Copy metadata from `src` into every target.
+
+        Returns one InjectionResult per target, in the order of `targets`.
+        `progress(done, total, result)` is called as each file finishes.
+        With `only_changed`, targets the state DB says were already written
+        from the same source metadata are skipped without running ExifTool.
+        The journal, if any, is cleared once every target has been tried.
+        A target listed more than once is written once, so two ExifTool
+        processes never write the same file.
+        """
+        unique = _unique_paths(targets)
+        if len(unique) != len(targets):
+            results = {os.path.abspath(r.path): r for r in self.run(src, unique, progress)}
+            return [results[os.path.abspath(path)]._replace(path=path) for path in targets]
+        self._cancel.clear()
+        total = len(targets)
+        results = [None] * total
+        done = 0
+
+        tags = get_profile(self.profile).args
+        fingerprint = source_hash = None
+        if (self.state is not None or self.journal is not None) and total:
+            fingerprint = self.fingerprints.get(src)
+        if self.state is not None and fingerprint:
+            # The same source written with another profile is a different state
+            source_hash = f'{fingerprint}/{self.profile}'
+        pending = list(range(total))
+        if self.only_changed and source_hash:
+            current = self.state.current(targets, source_hash)
+            pending = []
+            for i, path in enumerate(targets):
+                if path in current:
+                    results[i] = InjectionResult(path, True, UNCHANGED)
+                    done += 1
+                    if progress:
+                        progress(done, total, results[i])
+                else:
+                    pending.append(i)
+
+        # Files that hung ExifTool before are not tried again
+        quarantine = self.exiftool.quarantine
+        if quarantine:
+            kept = []
+            for i in pending:
+                if targets[i] in quarantine:
+                    results[i] = InjectionResult(targets[i], False, quarantine[targets[i]])
+                    done += 1
+                    if progress:
+                        progress(done, total, results[i])
+                else:
+                    kept.append(i)
+            pending = kept
+
+        if self.journal is not None:
+            self.journal.begin(src, [targets[i] for i in pending], self.profile, fingerprint, self.safe_write)
+        splice = self._splice_source(src, tags) if pending else None
+        if self.snapshots and pending:
+            src = self.snapshots.get(src)
+        size = self._chunk_size(len(pending))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._copy, src, [targets[i] for i in chunk], tags, splice): chunk
+                       for chunk in chunked(pending, size)}
+            try:
+                for future in as_completed(futures):
+                    chunk_results = future.result()
+                    for i, result in zip(futures[future], chunk_results):
+                        results[i] = result
+                        done += 1
+                        if progress:
+                            progress(done, total, result)
+                    if source_hash:
+                        self.state.record([r.path for r in chunk_results if r.ok], source_hash)
+                    if self.journal is not None:
+                        self.checkpoint(chunk_results)
+            finally:
+                for future in futures:
+                    future.cancel()
+        for i, path in enumerate(targets):
+            if results[i] is None:
+                results[i] = InjectionResult(path, False, CANCELLED)
+        # Interrupted batches keep their checkpoint for resume()
+        if self.journal is not None and not self.cancelled:
+            self.journal.clear()
+        return results
+
+    def checkpoint(self, chunk_results):
+        if not self.safe_write:
+            # Safe writes log `done` themselves, right after the renames
+            self.journal.mark(DONE, [r.path for r in chunk_results if r.ok])
+        self.journal.mark(FAILED, [r.path for r in chunk_results if not r.ok and r.message != CANCELLED])
+
+    def resume(self, progress=None):
+        """Finish the batch left in the journal by a crash or a cancel.
+
+        Half-committed targets are renamed into place first; pending and
+        failed ones run again with the batch's source, profile and write
+        mode. Returns the results of the targets that still had to be
+        written, and failures of the renames. If the source metadata changed meanwhile, they all fail
+        and the checkpoint is dropped.
+        """
+        batch, remaining, failed = self.journal.recover()
+        if batch is None:
+            return []
+        failed = [InjectionResult(path, False, message) for path, message in failed.items()]
+        if batch.get('source_hash') and self.fingerprints.get(batch['src']) != batch['source_hash']:
+            self.journal.clear()
+            return failed + [InjectionResult(path, False, SOURCE_CHANGED) for path in remaining]
+        self.profile = batch['profile']
+        self.safe_write = batch.get('safe_write', False)
+        return failed + self.run(batch['src'], remaining, progress=progress)
+
+    def _splice_source(self, src, tags):
+        # Splicing moves whole segments, so it only stands in for `-all:all`
+        if not self.splice or tags != ['-all:all']:
+            return None
+        try:
+            return SpliceSource(src)
+        except (ValueError, OSError):
+            return None
+
+    def _copy(self, src, chunk, tags, splice=None):
+        if self.cancelled:
+            return [InjectionResult(path, False, CANCELLED) for path in chunk]
+        if self.journal is not None and self.safe_write:
+            results = self._copy_journaled(src, chunk, tags, splice)
+        else:
+            spliced = self._splice(splice, chunk)
+            for path in list(spliced):
+                try:
+                    commit_temp(path)
+                except OSError:
+                    discard_temp(path)
+                    del spliced[path]
+            results = self._with_exiftool(src, chunk, tags, spliced)
+        return [r._replace(size=_file_size(r.path)) if r.ok else r for r in results]
+
+    def _splice(self, splice, chunk):
+        """Splice `splice` into temp copies of the targets that allow it.
+
+        Returns {path: InjectionResult} of those; the rest of the chunk is
+        left to ExifTool.
+        """
+        spliced = {}
+        if splice is None:
+            return spliced
+        for path in chunk:
+            started = time.monotonic()
+            try:
+                splice_metadata(splice, path)
+            except (ValueError, OSError):
+                discard_temp(path)
+                continue
+            spliced[path] = InjectionResult(path, True, SPLICED, (), time.monotonic() - started)
+        return spliced
+
+    def _with_exiftool(self, src, chunk, tags, spliced, output=None):
+        # Results for `chunk` in order, from `spliced` or else from ExifTool
+        rest = [path for path in chunk if path not in spliced]
+        written = {}
+        if rest:
+            written = {r[0]: InjectionResult(*r)
+                       for r in self.exiftool.copy_metadata_many(src, rest, tags, output=output)}
+        return [spliced.get(path) or written[path] for path in chunk]
+
+    def _copy_journaled(self, src, chunk, tags, splice=None):
+        # Leftovers of an interrupted run would make `-o` refuse the target
+        for path in chunk:
+            discard_temp(path)
+        results = self._with_exiftool(src, chunk, tags, self._splice(splice, chunk), output=TEMP_FORMAT)
+        for i, result in enumerate(results):
+            if result.ok:
+                try:
+                    fsync_path(temp_path(result.path))
+                except OSError as e:
+                    results[i] = result._replace(ok=False, message=str(e))
+            else:
+                discard_temp(result.path)
+        written = [r.path for r in results if r.ok]
+        self.journal.mark(WRITTEN, written)
+        directories = set()
+        for i, result in enumerate(results):
+            if not result.ok:
+                continue
+            try:
+                commit_temp(result.path)
+                directories.add(os.path.dirname(os.path.abspath(result.path)))
+            except OSError as e:
+                discard_temp(result.path)
+                results[i] = result._replace(ok=False, message=str(e))
+        # The renames themselves are only durable once their directories are
+        for directory in directories:
+            fsync_path(directory)
+        self.journal.mark(DONE, [r.path for r in results if r.ok])
+        return results
+
+
+def _unique_paths(paths):
+    # First spelling of each file, in order
+    seen = set()
+    unique = []
+    for path in paths:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
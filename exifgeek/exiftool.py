@@ -0,0 +1,773 @@
+import os
+import json
+import queue
+import re
+import atexit
+import functools
+import itertools
+import selectors
+import threading
+import subprocess
+import time
+from collections import deque
+
+from .metadata import Metadata, parse_json, parse_json_stream
+
+# Watchdog defaults: seconds per file, plus seconds per MB of it
+TIMEOUT = 30.0
+TIMEOUT_PER_MB = 1.0
+
+# Message prefix of files that hung ExifTool
+QUARANTINED = "Quarantined"
+# Message prefix of targets not written because their source hung ExifTool
+SOURCE_TIMED_OUT = "Source timed out"
+
+# Paths per command of get_metadata_many()
+READ_CHUNK = 64
+
+
+class ExifToolError(Exception):
+    pass
+
+
+class ExifToolTimeout(ExifToolError):
+    """A command missed its deadline; the session has been restarted.
+
+    `index` is the file the command was stuck on (counted by `-v0`
+    headers, 0 without them), `elapsed` the seconds spent on it, and
+    `out`/`err` what ExifTool had printed so far.
+    """
+
+    def __init__(self, index, elapsed, out, err):
+        super().__init__(f"exiftool timed out after {elapsed:.1f}s")
+        self.index = index
+        self.elapsed = elapsed
+        self.out = out
+        self.err = err
+
+
+# First characters ExifTool strips from, or skips, a plain argfile line
+ARGFILE_LEADING = '# \t\n\r\f\v'
+
+
+def argfile_line(arg):
+    """`arg` as one line of the `-@` argfile, read back unchanged by ExifTool.
+
+    Plain lines lose leading white space, are split at line breaks and
+    are skipped when empty or starting with `#`; such arguments are sent
+    as `#[CSTR]` lines with C escapes instead. ExifTool leaves `$` and
+    `@` backslash-escaped in those, so an argument needing both raises
+    ExifToolError.
+    """
+    arg = str(arg)
+    if arg and arg[0] not in ARGFILE_LEADING and '\n' not in arg and '\r' not in arg:
+        return arg
+    if '$' in arg or '@' in arg:
+        raise ExifToolError(f"exiftool can't be passed {arg!r}")
+    return '#[CSTR]' + arg.replace('\\', '\\\\').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class ExifToolProcess:
+    """One long-lived `exiftool -stay_open True -@ -` session.
+
+    Commands are written to stdin as an argfile and terminated with
+    `-execute<N>`; `-echo4 {ready<N>}` puts the same marker on stderr so
+    both streams can be read up to the end of that command.
+    """
+
+    def __init__(self, cmd_prefix):
+        self.cmd_prefix = cmd_prefix
+        self.proc = None
+        self._ids = itertools.count(1)
+
+    @property
+    def running(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            self.cmd_prefix + ['-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def execute(self, *args, timeline=None, deadlines=None):
+        """Run one command and return its decoded (stdout, stderr).
+
+        With a `timeline` list, (stdout lines so far, monotonic time) is
+        appended whenever stdout output arrives. `deadlines` are the
+        seconds allowed for each file of the command, timed from its
+        `-v0` header (the first one also from the start of the command);
+        missing one raises ExifToolTimeout.
+        """
+        if not self.running:
+            self.start()
+        seq = next(self._ids)
+        ready = f'{{ready{seq}}}'
+        lines = [argfile_line(a) for a in args] + ['-echo4', ready, f'-execute{seq}']
+        try:
+            self.proc.stdin.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            self.proc.stdin.flush()
+            out, err = self._read_until(ready.encode('ascii'), timeline, deadlines)
+        except ExifToolTimeout:
+            # Respawn right away so Perl starts up before the next command
+            self.kill()
+            self.start()
+            raise
+        except BaseException:
+            # Whatever is left in the pipes belongs to a command we gave up
+            # on, so this session can't be trusted for the next one
+            self.kill()
+            raise
+        return out.decode('utf-8', 'replace'), err.decode('utf-8', 'replace')
+
+    def stream(self, *args, timeout=None):
+        """Run one command, yielding its stdout in chunks as they arrive.
+
+        The generator's return value is the decoded stderr. `timeout` is
+        the longest wait for any output; missing it raises ExifToolTimeout
+        with `index` 0. Abandoning the generator early kills the session.
+        """
+        if not self.running:
+            self.start()
+        seq = next(self._ids)
+        ready = f'{{ready{seq}}}'
+        marker = ready.encode('ascii')
+        lines = [argfile_line(a) for a in args] + ['-echo4', ready, f'-execute{seq}']
+        err = bytearray()
+        held = b''
+        sel = selectors.DefaultSelector()
+        try:
+            self.proc.stdin.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            self.proc.stdin.flush()
+            for stream in (self.proc.stdout, self.proc.stderr):
+                sel.register(stream, selectors.EVENT_READ)
+            pending = 2
+            while pending:
+                events = sel.select(timeout)
+                if not events:
+                    raise ExifToolTimeout(0, timeout, '', err.decode('utf-8', 'replace'))
+                for key, _ in events:
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        raise ExifToolError("exiftool exited unexpectedly")
+                    if key.fileobj is self.proc.stderr:
+                        err += chunk
+                        if err.rstrip(b'\r\n').endswith(marker):
+                            sel.unregister(key.fileobj)
+                            pending -= 1
+                        continue
+                    data = held + chunk
+                    if data.rstrip(b'\r\n').endswith(marker):
+                        sel.unregister(key.fileobj)
+                        pending -= 1
+                        data, held = data.rstrip(b'\r\n')[:-len(marker)], b''
+                    else:
+                        # The marker may be split over two reads
+                        keep = len(marker) + 2
+                        data, held = data[:-keep], data[-keep:]
+                    if data:
+                        yield data
+        except ExifToolTimeout:
+            self.kill()
+            self.start()
+            raise
+        except BaseException:
+            # Covers GeneratorExit too: the rest of the output is unread
+            self.kill()
+            raise
+        finally:
+            sel.close()
+        return _strip_marker(err, marker).decode('utf-8', 'replace')
+
+    def _read_until(self, marker, timeline=None, deadlines=None):
+        bufs = {self.proc.stdout: bytearray(), self.proc.stderr: bytearray()}
+        sel = selectors.DefaultSelector()
+        for stream in bufs:
+            sel.register(stream, selectors.EVENT_READ)
+        started = time.monotonic()
+        deadline = started + deadlines[0] if deadlines else None
+        headers = 0
+        try:
+            pending = len(bufs)
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                events = sel.select(timeout)
+                if not events and deadline is not None and time.monotonic() >= deadline:
+                    raise ExifToolTimeout(max(headers - 1, 0), time.monotonic() - started,
+                                          *(bufs[s].decode('utf-8', 'replace')
+                                            for s in (self.proc.stdout, self.proc.stderr)))
+                for key, _ in events:
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        raise ExifToolError("exiftool exited unexpectedly")
+                    buf = bufs[key.fileobj]
+                    buf += chunk
+                    if timeline is not None and key.fileobj is self.proc.stdout:
+                        timeline.append((buf.count(b'\n'), time.monotonic()))
+                    if deadlines and key.fileobj is self.proc.stdout:
+                        seen = buf.count(FILE_HEADER)
+                        if seen != headers:
+                            # The next file started, its own allowance runs from here
+                            headers = seen
+                            started = time.monotonic()
+                            deadline = started + deadlines[min(headers - 1, len(deadlines) - 1)]
+                    if buf.rstrip(b'\r\n').endswith(marker):
+                        sel.unregister(key.fileobj)
+                        pending -= 1
+        finally:
+            sel.close()
+        return tuple(_strip_marker(bufs[s], marker) for s in (self.proc.stdout, self.proc.stderr))
+
+    def close(self):
+        if not self.running:
+            self.proc = None
+            return
+        try:
+            self.proc.stdin.write(b'-stay_open\nFalse\n')
+            self.proc.stdin.flush()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+            self.proc.wait()
+        self._close_pipes()
+
+    def kill(self):
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self._close_pipes()
+
+    def _close_pipes(self):
+        for stream in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        self.proc = None
+
+
+# Printed by -v0 as ExifTool starts on each file
+FILE_HEADER = b'======== '
+# Printed to stderr by -progress as ExifTool starts on file N of a command
+PROGRESS_LINE = re.compile(r'^======== .* \[(\d+)/\d+\]\r?$', re.M)
+
+
+def _last_started(err):
+    # Index of the last file announced by -progress, or -1
+    starts = PROGRESS_LINE.findall(err)
+    return int(starts[-1]) - 1 if starts else -1
+
+
+def _returned(generator, sink):
+    # Pass `generator` through, appending its return value to `sink`
+    sink.append((yield from generator))
+
+
+def _strip_marker(buf, marker):
+    data = bytes(buf).rstrip(b'\r\n')
+    return data[:-len(marker)]
+
+
+@functools.lru_cache(maxsize=None)
+def _cmd_prefix():
+    # Resolved once per process, RESOURCEPATH is fixed at launch
+    # Check for bundled resource in py2app
+    if 'RESOURCEPATH' in os.environ:
+        bundled_path = os.path.join(os.environ['RESOURCEPATH'], 'exiftool_src', 'exiftool')
+        if os.path.exists(bundled_path):
+            return ('perl', bundled_path)
+    return ('exiftool',)
+
+
+def bundled_dir():
+    """The exiftool_src directory of the app bundle or source checkout, if any."""
+    candidates = []
+    if 'RESOURCEPATH' in os.environ:
+        candidates.append(os.path.join(os.environ['RESOURCEPATH'], 'exiftool_src'))
+    candidates.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'exiftool_src'))
+    for path in candidates:
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+class ExifTool:
+    """Pooled client over up to `size` persistent ExifTool sessions.
+
+    Sessions are spawned on first use and handed out to one caller at a
+    time, so an instance can be shared between threads.
+    """
+
+    def __init__(self, size=1, timeout=TIMEOUT, timeout_per_mb=TIMEOUT_PER_MB):
+        self.size = max(1, size)
+        # Watchdog: each file gets `timeout` seconds plus `timeout_per_mb`
+        # per MB of its size; None disables it
+        self.timeout = timeout
+        self.timeout_per_mb = timeout_per_mb
+        # path -> message, for files that made ExifTool miss its deadline
+        self.quarantine = {}
+        self._idle = queue.LifoQueue()
+        self._procs = []
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    @staticmethod
+    def get_cmd_prefix():
+        return list(_cmd_prefix())
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._procs) < self.size:
+                proc = ExifToolProcess(self.get_cmd_prefix())
+                self._procs.append(proc)
+                return proc
+        return self._idle.get()
+
+    def _release(self, proc):
+        self._idle.put(proc)
+
+    def resize(self, size):
+        with self._lock:
+            self.size = max(1, size)
+            while len(self._procs) > self.size:
+                try:
+                    proc = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._procs.remove(proc)
+                proc.close()
+
+    def execute(self, *args, timeline=None, deadlines=None):
+        proc = self._acquire()
+        try:
+            return proc.execute(*args, timeline=timeline, deadlines=deadlines)
+        finally:
+            self._release(proc)
+
+    def file_timeout(self, path):
+        """Seconds ExifTool may spend on `path`, None without a watchdog."""
+        return file_timeout(path, self.timeout, self.timeout_per_mb)
+
+    def deadlines(self, paths):
+        if self.timeout is None:
+            return None
+        return [self.file_timeout(path) for path in paths]
+
+    def _quarantine(self, path, elapsed):
+        message = quarantine_message(elapsed)
+        self.quarantine[path] = message
+        return message
+
+    def warm(self, *args):
+        """Spawn every session now and run `args` (default `warmup_args()`) on each.
+
+        All processes are started before waiting on any, so their Perl
+        startup overlaps; sessions already spawned are left alone.
+        """
+        procs = []
+        with self._lock:
+            while len(self._procs) < self.size:
+                proc = ExifToolProcess(self.get_cmd_prefix())
+                self._procs.append(proc)
+                procs.append(proc)
+        try:
+            for proc in procs:
+                proc.start()
+            for proc in procs:
+                proc.execute(*(args or warmup_args()))
+        finally:
+            for proc in procs:
+                self._release(proc)
+
+    def close(self):
+        with self._lock:
+            for proc in self._procs:
+                proc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_metadata(self, path, fast=0):
+        try:
+            out, err = self.execute(*fast_args(fast), '-j', path, deadlines=self.deadlines([path]))
+            if out.strip():
+                data = json.loads(out)
+                return data[0] if data else {}
+            return {"Error": first_error(err) or "Failed to read metadata"}
+        except ExifToolTimeout as e:
+            return {"Error": self._quarantine(path, e.elapsed)}
+        except FileNotFoundError:
+            return {"Error": "exiftool not found in PATH"}
+        except Exception as e:
+            return {"Error": str(e)}
+
+    def read_metadata(self, path, fast=0):
+        """Grouped, typed read of `path` as a Metadata.
+
+        `-l` returns the raw value next to the print-converted one, which
+        saves a second `-n` pass; `-a` keeps duplicate tags.
+        """
+        try:
+            out, err = self.execute(*fast_args(fast), '-j', '-G1', '-struct', '-a', '-l', path,
+                                    deadlines=self.deadlines([path]))
+            if out.strip():
+                records = parse_json(out)
+                if records:
+                    return records[0]
+            return Metadata(path, error=first_error(err) or "Failed to read metadata")
+        except ExifToolTimeout as e:
+            return Metadata(path, error=self._quarantine(path, e.elapsed))
+        except FileNotFoundError:
+            return Metadata(path, error="exiftool not found in PATH")
+        except Exception as e:
+            return Metadata(path, error=str(e))
+
+    def stream_metadata(self, paths, fast=0, tags=None):
+        """Read `paths` with one command, yielding Metadata as ExifTool prints it.
+
+        The JSON output is parsed incrementally, so memory stays flat for
+        any number of files. `tags` limits the read to those tag names
+        (`Model`, `EXIF:DateTimeOriginal`, ...) instead of all of them.
+        Files ExifTool printed nothing for (missing, unreadable) follow
+        with `.error` set. A file that stalls ExifTool past its deadline is
+        quarantined and the files not printed yet are read with a new
+        command.
+        """
+        paths = list(paths)
+        if not paths:
+            return
+        # ExifTool prints files in argument order, so a path given twice
+        # takes its indices in turn
+        positions = {}
+        for i, path in enumerate(paths):
+            positions.setdefault(path, deque()).append(i)
+        deadlines = self.deadlines(paths)
+        printed = set()
+        stderr = []
+        proc = self._acquire()
+        # -progress announces each file on stderr before reading it, which
+        # also restarts the watchdog's wait for every file
+        chunks = proc.stream(*fast_args(fast), *tag_args(tags), '-progress', '-j', '-G1', '-struct', '-a', '-l',
+                             *paths, timeout=max(deadlines) if deadlines else None)
+        try:
+            for meta in parse_json_stream(_returned(chunks, stderr)):
+                indices = positions.get(meta.source)
+                if indices:
+                    printed.add(indices.popleft())
+                yield meta
+        except ExifToolTimeout as e:
+            self._release(proc)
+            proc = None
+            stuck = _last_started(e.err)
+            if stuck < 0:
+                raise
+            # Output of files read before the stuck one may still have been
+            # buffered by Perl, so those are read again
+            yield Metadata(paths[stuck], error=self._quarantine(paths[stuck], e.elapsed))
+            rest = [path for i, path in enumerate(paths) if i not in printed and i != stuck]
+            yield from self.stream_metadata(rest, fast, tags)
+            return
+        finally:
+            if proc is not None:
+                # Abandoned early: closing the stream kills the session
+                # before it goes back to the pool
+                chunks.close()
+                self._release(proc)
+        errors, _, _ = attribute_messages(paths, stderr[0] if stderr else '')
+        for i, path in enumerate(paths):
+            if i not in printed:
+                yield Metadata(path, error=errors.get(path, "Failed to read metadata"))
+
+    def get_metadata_many(self, paths, tags=None, fast=False, chunk_size=READ_CHUNK):
+        """Read `paths` over the whole pool, yielding (path, Metadata) as each finishes.
+
+        Chunks of `chunk_size` paths are handed to one reader thread per
+        session, each streaming its chunk with stream_metadata(). Results
+        come in completion order, not argument order. Only one chunk per
+        session is in flight and the result queue is bounded, so `paths`
+        may be a lazy iterable and a slow consumer stalls the ExifTool
+        processes instead of piling up results.
+        """
+        chunks = _chunks(paths, chunk_size)
+        chunks_lock = threading.Lock()
+        results = queue.Queue(maxsize=self.size * chunk_size)
+        stop = threading.Event()
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    with chunks_lock:
+                        chunk = next(chunks, None)
+                    if chunk is None:
+                        return
+                    metas = self._read_chunk(chunk, fast, tags)
+                    try:
+                        for meta in metas:
+                            results.put((meta.source, meta))
+                            if stop.is_set():
+                                return
+                    finally:
+                        metas.close()
+            finally:
+                results.put(None)
+
+        threads = [threading.Thread(target=reader, daemon=True) for _ in range(self.size)]
+        for thread in threads:
+            thread.start()
+        running = len(threads)
+        try:
+            while running:
+                item = results.get()
+                if item is None:
+                    running -= 1
+                else:
+                    yield item
+        finally:
+            # Abandoned early: unblock readers waiting on a full queue
+            stop.set()
+            while running:
+                if results.get() is None:
+                    running -= 1
+
+    def _read_chunk(self, chunk, fast, tags):
+        # stream_metadata(), with failures reported per file like read_metadata()
+        done = set()
+        try:
+            for meta in self.stream_metadata(chunk, fast, tags):
+                done.add(meta.source)
+                yield meta
+        except Exception as e:
+            error = "exiftool not found in PATH" if isinstance(e, FileNotFoundError) else str(e)
+            for path in chunk:
+                if path not in done:
+                    yield Metadata(path, error=error)
+
+    def copy_metadata(self, src, dest, tags=None):
+        return self.copy_metadata_many(src, [dest], tags)[0][1:3]
+
+    def copy_metadata_many(self, src, dests, tags=None, output=None):
+        """Copy metadata from `src` into all `dests` with a single command.
+
+        The source is parsed once for the whole chunk. `tags` are the copy
+        arguments following `-TagsFromFile src` (`-all:all` by default, see
+        profiles.py). With `output`, an `-o` file name format, the targets
+        are left alone and written copies are created there instead.
+        Returns one (path, ok, message, warnings, elapsed) tuple per
+        destination, in order; `elapsed` is in seconds, None if unknown.
+        """
+        if src in self.quarantine:
+            return self._source_failed(src, dests, self.quarantine[src])
+        tags = tags or ['-all:all']
+        # -overwrite_original avoids creating _original backup files
+        mode = ['-o', output] if output else ['-overwrite_original']
+        timeline = []
+        deadlines = self.deadlines(dests)
+        if deadlines:
+            # The source is read while the first target is being written
+            deadlines[0] += self.file_timeout(src)
+        try:
+            # -v0 prints an autoflushed header as each file starts, which
+            # times the files of one command individually
+            out, err = self.execute('-v0', '-TagsFromFile', src, *tags, *mode, *dests,
+                                    timeline=timeline, deadlines=deadlines)
+        except ExifToolTimeout as e:
+            return self._copy_timed_out(src, dests, tags, output, e, timeline)
+        except Exception as e:
+            return [(dest, False, str(e), (), None) for dest in dests]
+        elapsed = file_timings(dests, out, timeline, time.monotonic())
+        return [r + (elapsed.get(r[0]),) for r in parse_write_results(dests, out, err)]
+
+    def _copy_timed_out(self, src, dests, tags, output, e, timeline):
+        # Files before the stuck one were finished, the stuck one is
+        # quarantined and the rest of the chunk runs again
+        if e.index == 0 and not self._source_readable(src):
+            # The source is read while the first target is being written,
+            # and rerunning with it would stall on every target in turn
+            return self._source_failed(src, dests, self._quarantine(src, e.elapsed))
+        finished, stuck, rest = dests[:e.index], dests[e.index], dests[e.index + 1:]
+        elapsed = file_timings(dests[:e.index + 1], e.out, timeline, time.monotonic())
+        errors, warnings, _ = attribute_messages(finished, e.err)
+        results = [(dest, dest not in errors, errors.get(dest, "Success"), tuple(warnings.get(dest, ())),
+                    elapsed.get(dest)) for dest in finished]
+        results.append((stuck, False, self._quarantine(stuck, e.elapsed), (), e.elapsed))
+        if rest:
+            results.extend(self.copy_metadata_many(src, rest, tags, output))
+        return results
+
+    def _source_readable(self, src):
+        # A plain read of `src` under its own deadline
+        try:
+            self.execute('-j', src, deadlines=self.deadlines([src]))
+        except ExifToolTimeout:
+            return False
+        except Exception:
+            pass
+        return True
+
+    @staticmethod
+    def _source_failed(src, dests, reason):
+        message = f"{SOURCE_TIMED_OUT}: {src} ({reason})"
+        return [(dest, False, message, (), None) for dest in dests]
+
+
+WARMUP_SAMPLE = os.path.join('t', 'images', 'ExifTool.jpg')
+
+
+def warmup_args():
+    """A dummy read of a bundled sample, shaped like `read_metadata`.
+
+    Besides Perl startup this compiles the JPEG/EXIF/XMP/IPTC modules and
+    the JSON writer, which a bare `-ver` leaves for the first real read.
+    """
+    base = bundled_dir()
+    sample = os.path.join(base, WARMUP_SAMPLE) if base else None
+    if sample and os.path.isfile(sample):
+        return ['-j', '-G1', '-struct', '-a', '-l', sample]
+    return ['-ver']
+
+
+def file_timeout(path, timeout, timeout_per_mb):
+    if timeout is None:
+        return None
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    return timeout + timeout_per_mb * size / (1 << 20)
+
+
+def quarantine_message(elapsed):
+    return f"{QUARANTINED}: exiftool timed out after {elapsed:.1f}s"
+
+
+def tag_args(tags):
+    return [f'-{tag}' for tag in tags or ()]
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def fast_args(level):
+    # -fastN (FastScan): skip trailers, and from 2 up maker notes too
+    return [f'-fast{int(level)}'] if level else []
+
+
+def first_error(stderr):
+    for line in stderr.splitlines():
+        if line.startswith('Error'):
+            return line.strip()
+    return None
+
+
+# Appended by -overwrite_original to the file it writes before renaming
+EXIFTOOL_TMP_SUFFIX = '_exiftool_tmp'
+
+# Summary lines ExifTool prints after a write command that got as far as the targets
+WRITE_SUMMARIES = ('files updated', 'files unchanged', "files weren't updated",
+                   'files created', 'files copied')
+# Message of a destination ExifTool printed no -v0 header for
+NOT_PROCESSED = "Not processed by exiftool"
+
+
+def parse_write_results(dests, out, err):
+    """Tie the messages of a multi-file write back to each destination.
+
+    ExifTool suffixes per-file messages with " - <file name as given>";
+    anything else on stderr with no summary on stdout (a missing
+    -TagsFromFile source, for instance) failed the whole command. The
+    command runs with -v0, so a destination without its header in `out`
+    was never opened and isn't counted as written either.
+    Returns one (path, ok, message, warnings) tuple per destination.
+    """
+    errors, warnings, unattributed = attribute_messages(dests, err)
+    if not any(summary in out for summary in WRITE_SUMMARIES):
+        message = first_error(err) or '\n'.join(unattributed) or out.strip() or "No output from exiftool"
+        return [(dest, False, message, ()) for dest in dests]
+    # Headers are whole lines, and a file name may hold line breaks itself
+    headers = '\n' + out.replace('\r\n', '\n') + '\n'
+    results = []
+    for dest in dests:
+        if dest in errors:
+            results.append((dest, False, errors[dest], tuple(warnings.get(dest, ()))))
+        elif f'\n======== {dest}\n' not in headers:
+            results.append((dest, False, NOT_PROCESSED, tuple(warnings.get(dest, ()))))
+        else:
+            results.append((dest, True, "Success", tuple(warnings.get(dest, ()))))
+    return results
+
+
+def attribute_messages(dests, err):
+    """Split stderr into ({dest: first error}, {dest: [warnings]}, other lines)."""
+    targets = set(dests)
+    errors = {}
+    warnings = {}
+    unattributed = []
+    for line in err.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        dest = _message_target(line, targets)
+        if dest is None:
+            unattributed.append(line)
+        elif line.startswith('Error'):
+            errors.setdefault(dest, line)
+        elif line.startswith('Warning'):
+            warnings.setdefault(dest, []).append(line)
+    return errors, warnings, unattributed
+
+
+def file_timings(dests, out, timeline, end):
+    """Seconds spent on each destination, from the arrival of `-v0` headers.
+
+    `timeline` holds (stdout lines so far, time) pairs; a file runs from
+    its header line to the next one, the last one until `end`.
+    """
+    targets = set(dests)
+    starts = []
+    points = iter(timeline)
+    point = next(points, None)
+    for lineno, line in enumerate(out.split('\n')):
+        if not (line.startswith('======== ') and line[9:] in targets):
+            continue
+        # The header is complete once more than `lineno` lines arrived
+        while point is not None and point[0] <= lineno:
+            point = next(points, None)
+        starts.append((line[9:], point[1] if point else end))
+    elapsed = {}
+    for i, (dest, start) in enumerate(starts):
+        stop = starts[i + 1][1] if i + 1 < len(starts) else end
+        elapsed[dest] = max(0.0, stop - start)
+    return elapsed
+
+
+def _message_target(line, targets):
+    # Paths may contain " - " themselves, so try every split point
+    idx = line.find(' - ')
+    while idx != -1:
+        name = line[idx + 3:]
+        if name in targets:
+            return name
+        idx = line.find(' - ', idx + 1)
+    if line.endswith(EXIFTOOL_TMP_SUFFIX):
+        # "Error: Temporary file already exists: <file>_exiftool_tmp"
+        idx = line.find(': ')
+        while idx != -1:
+            name = line[idx + 2:-len(EXIFTOOL_TMP_SUFFIX)]
+            if name in targets:
+                return name
+            idx = line.find(': ', idx + 1)
+    return None
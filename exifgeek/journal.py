@@ -0,0 +1,167 @@
+import os
+import json
+import shutil
+import threading
+
+from .state import data_dir
+from .exiftool import EXIFTOOL_TMP_SUFFIX
+
+# Temp copies sit next to their target, so the final os.replace stays on
+# one filesystem and is atomic; the leading dot keeps scans off leftovers
+TEMP_MARK = '.exifgeek-tmp'
+# ExifTool `-o` format producing temp_path(target)
+TEMP_FORMAT = '%d.%f' + TEMP_MARK + '.%e'
+
+# Default journal files in data_dir(), one each for the window and the
+# command line so neither overwrites the other's checkpoint
+GUI_JOURNAL = 'journal.jsonl'
+CLI_JOURNAL = 'cli-journal.jsonl'
+
+# Message of a target whose temp copy couldn't be moved into place
+COMMIT_FAILED = "Could not move the written copy into place"
+
+WRITTEN = 'written'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def temp_path(path):
+    directory, name = os.path.split(path)
+    # Split like ExifTool's %f and %e: at the last dot, even a leading
+    # one, and with the dot before %e kept when there is no extension
+    stem, dot, ext = name.rpartition('.')
+    if not dot:
+        stem, ext = name, ''
+    return os.path.join(directory, f'.{stem}{TEMP_MARK}.{ext}')
+
+
+def fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def discard_temp(path):
+    try:
+        os.remove(temp_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def commit_temp(path):
+    """Move the finished temp copy of `path` over it."""
+    tmp = temp_path(path)
+    shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+
+
+class Journal:
+    """Append-only JSON-lines checkpoint of one injection batch.
+
+    The first line holds the batch (source, its fingerprint, profile,
+    write mode, targets); each chunk then logs its targets as `done` or
+    `failed`. With safe writes, targets are also logged as `written` once
+    their temp copies are fsynced, before being renamed into place, so
+    after a crash every target is either untouched, recoverable from its
+    temp copy, or finished.
+    """
+
+    def __init__(self, path=None, name=GUI_JOURNAL):
+        self.path = path or os.path.join(data_dir(), name)
+        self._file = None
+        self._lock = threading.Lock()
+
+    def begin(self, src, targets, profile, source_hash=None, safe_write=False):
+        batch = {'src': src, 'source_hash': source_hash, 'profile': profile,
+                 'safe_write': safe_write, 'targets': list(targets)}
+        with self._lock:
+            self._close()
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._append({'batch': batch})
+
+    def mark(self, status, paths):
+        if not paths:
+            return
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._append({status: list(paths)})
+
+    def _append(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def load(self):
+        """Return (batch, {path: status}), or (None, {}) without a journal."""
+        batch = None
+        status = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line of a crash
+                        break
+                    if 'batch' in record:
+                        batch = record['batch']
+                        status = {}
+                    for key in (WRITTEN, DONE, FAILED):
+                        for path in record.get(key, ()):
+                            status[path] = key
+        except FileNotFoundError:
+            pass
+        return batch, status
+
+    def pending(self):
+        """Return (batch, targets not done yet, failed ones included)."""
+        batch, status = self.load()
+        if batch is None:
+            return None, []
+        return batch, [path for path in batch['targets'] if status.get(path) not in (WRITTEN, DONE)]
+
+    def recover(self):
+        """Finish renames cut short, then return what `pending()` does.
+
+        Temp files of an ExifTool killed mid-write are removed too, since
+        ExifTool refuses to write a file while its temp file exists.
+        Returns (batch, remaining, {path: error}); a rename that fails (the
+        target was moved or deleted meanwhile, say) discards its temp copy
+        and is reported in the last item rather than stopping the others.
+        """
+        batch, status = self.load()
+        failed = {}
+        for path, state in status.items():
+            if state == WRITTEN and os.path.exists(temp_path(path)):
+                try:
+                    commit_temp(path)
+                except OSError as e:
+                    discard_temp(path)
+                    failed[path] = f"{COMMIT_FAILED}: {e}"
+        batch, remaining = self.pending()
+        for path in remaining:
+            try:
+                os.remove(path + EXIFTOOL_TMP_SUFFIX)
+            except FileNotFoundError:
+                pass
+        return batch, remaining, failed
+
+    def clear(self):
+        with self._lock:
+            self._close()
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,154 @@
+import json
+import codecs
+
+
+class Tag:
+    """One tag occurrence: raw (-n) value and print-converted value."""
+
+    __slots__ = ('group', 'name', 'value', 'print_value', 'description')
+
+    def __init__(self, group, name, value, print_value, description=None):
+        self.group = group
+        self.name = name
+        self.value = value
+        self.print_value = print_value
+        self.description = description
+
+    @property
+    def key(self):
+        return f'{self.group}:{self.name}' if self.group else self.name
+
+    def __repr__(self):
+        return f'Tag({self.key!r}, {self.print_value!r})'
+
+
+class Metadata:
+    """Tags of one file in ExifTool's order, indexed by group and by name.
+
+    Duplicate tags (the same name in several groups, or `-a` duplicates
+    within one) are all kept.
+    """
+
+    __slots__ = ('source', 'tags', 'error', '_by_group', '_by_name')
+
+    def __init__(self, source=None, tags=(), error=None):
+        self.source = source
+        self.tags = list(tags)
+        self.error = error
+        self._by_group = {}
+        self._by_name = {}
+        for tag in self.tags:
+            self._by_group.setdefault(tag.group, []).append(tag)
+            self._by_name.setdefault(tag.name, []).append(tag)
+
+    @classmethod
+    def from_exiftool(cls, record):
+        """Build from one file's `-j -G1 -struct -l` object, as (key, entry) pairs."""
+        source = None
+        tags = []
+        for key, entry in record:
+            if key == 'SourceFile':
+                source = entry
+                continue
+            group, _, name = key.rpartition(':')
+            if isinstance(entry, _Pairs):
+                entry = dict(entry)
+                print_value = _plain(entry.get('val'))
+                value = _plain(entry['num']) if 'num' in entry else print_value
+                tags.append(Tag(group, name, value, print_value, entry.get('desc')))
+            else:
+                entry = _plain(entry)
+                tags.append(Tag(group, name, entry, entry))
+        return cls(source, tags)
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __iter__(self):
+        return iter(self.tags)
+
+    def __bool__(self):
+        return bool(self.tags) or self.error is not None
+
+    def groups(self):
+        return list(self._by_group)
+
+    def group(self, group):
+        return list(self._by_group.get(group, ()))
+
+    def all(self, name):
+        return list(self._by_name.get(name, ()))
+
+    def get(self, name, group=None, default=None):
+        """First tag called `name`, optionally restricted to `group`."""
+        for tag in self._by_name.get(name, ()):
+            if group is None or tag.group == group:
+                return tag
+        return default
+
+    def to_dict(self, numeric=False):
+        """Flat `Group:Tag -> value` dict, as `-j -G1` would print it."""
+        data = {}
+        if self.error is not None:
+            data['Error'] = self.error
+        for tag in self.tags:
+            data.setdefault(tag.key, tag.value if numeric else tag.print_value)
+        return data
+
+
+class _Pairs(list):
+    pass
+
+
+def _plain(value):
+    if isinstance(value, _Pairs):
+        return {k: _plain(v) for k, v in value}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def parse_json(text):
+    """Parse `-j -G1 -struct -l` output into one Metadata per file."""
+    records = json.loads(text, object_pairs_hook=_Pairs)
+    return [Metadata.from_exiftool(record) for record in records]
+
+
+def parse_json_stream(chunks):
+    """Like parse_json, but over `chunks` of bytes as read from the pipe.
+
+    Each file's Metadata is yielded as soon as its object is complete, so
+    only about one object is held in memory at a time. ExifTool closes
+    top-level objects with a `}` at the start of a line (nested ones are
+    indented), which is when decoding is attempted.
+    """
+    decoder = json.JSONDecoder(object_pairs_hook=_Pairs)
+    text = codecs.getincrementaldecoder('utf-8')('replace')
+    buf = ''
+    scan = 0
+    for chunk in chunks:
+        buf += text.decode(chunk)
+        while True:
+            start = _skip_separators(buf, 0)
+            end = buf.find('\n}', max(scan, start))
+            if end == -1:
+                # Keep a trailing newline in view for the next chunk
+                scan = max(len(buf) - 1, 0)
+                break
+            try:
+                record, stop = decoder.raw_decode(buf, start)
+            except ValueError:
+                scan = end + 2
+                continue
+            yield Metadata.from_exiftool(record)
+            buf = buf[stop:]
+            scan = 0
+    buf += text.decode(b'', final=True)
+    if buf[_skip_separators(buf, 0):].strip(']\r\n '):
+        raise ValueError("Truncated JSON output from exiftool")
+
+
+def _skip_separators(buf, pos):
+    while pos < len(buf) and buf[pos] in ' \t\r\n,[':
+        pos += 1
+    return pos
@@ -0,0 +1,131 @@
+import os
+import re
+
+# Reason codes for files kept out of the target list
+SKIP_UNSUPPORTED = 'unsupported-format'
+SKIP_MISMATCH = 'content-mismatch'
+SKIP_EMPTY = 'empty-file'
+SKIP_UNREADABLE = 'unreadable'
+
+# `exiftool -listwf` of the bundled ExifTool 13.45
+WRITABLE_EXTENSIONS = frozenset("""
+    360 3g2 3gp 3gp2 3gpp aax ai ait apng arq arw avif ciff cr2 cr3 crm crw cs1
+    dcp dng dr4 dvb eps eps2 eps3 epsf erf exif exv f4a f4b f4p f4v fff flif gif
+    glv gpr hdp heic heif hif icc icm iiq ind indd indt insp j2k jng jp2 jpe jpeg
+    jpf jpg jph jpm jps jpx jxl jxr lrf lrv m4a m4b m4p m4v mef mie mng mos mov
+    mp4 mpo mqv mrw nef nksc nrw orf ori pbm pdf pef pgm png ppm ps ps2 ps3 psb
+    psd psdt qt raf raw rw2 rwl sr2 srw thm tif tiff vrd wdp webp x3f xmp
+""".split())
+
+# Patterns of the %magicNumber table in lib/Image/ExifTool.pm, which
+# ExifTool matches at the start of the first 1024 bytes before trusting
+# an extension. TIFF and the TIFF-based raws only have their byte order
+# checked there, as some raw formats use their own magic number.
+MAGIC_NUMBERS = {
+    'JPEG': rb'\xff\xd8\xff',
+    'TIFF': rb'(II|MM)',
+    'ORF': rb'(II|MM)',
+    'RAW': rb'(.{25}ARECOYK|II|MM)',
+    'FLIR': rb'[AF]FF\0',
+    'MOV': rb'.{4}(free|skip|wide|ftyp|pnot|PICT|pict|moov|mdat|junk|uuid)',
+    'JP2': rb'(\0\0\0\x0cjP(  |\x1a\x1a)\x0d\x0a\x87\x0a|\xff\x4f\xff\x51\0)',
+    'JXL': rb'(\xff\x0a|\0\0\0\x0cJXL \x0d\x0a......ftypjxl )',
+    'PNG': rb'(\x89P|\x8aM|\x8bJ)NG\r\n\x1a\n',
+    'GIF': rb'GIF8[79]a',
+    'RIFF': rb'(RIFF|LA0[234]|OFR |LPAC|wvpk|RF64)',
+    'PSD': rb'8BPS\0[\x01\x02]',
+    'PDF': rb'\s*%PDF-\d+\.\d+',
+    'EPS': rb'(%!PS|%!Ad|\xc5\xd0\xd3\xc6)',
+    'PS': rb'(%!PS|%!Ad|\xc5\xd0\xd3\xc6)',
+    'MRW': rb'\0MR[MI]',
+    'RAF': rb'FUJIFILM',
+    'CRW': rb'(II|MM).{4}HEAP(CCDR|JPGM)',
+    'X3F': rb'FOVb',
+    'FLIF': rb'FLIF[0-\x6f][0-2]',
+    'ICC': rb'.{12}(scnr|mntr|prtr|link|spac|abst|nmcl|nkpf|cenc|mid |mlnk|mvis)'
+           rb'(XYZ |Lab |Luv |YCbr|Yxy |RGB |GRAY|HSV |HLS |CMYK|CMY |[2-9A-F]CLR|nc..|\0{4}){2}',
+    'PPM': rb'P[1-6]\s+',
+    'EXIF': rb'(II\x2a\0|MM\0\x2a)',
+    'EXV': rb'\xff\x01Exiv2',
+    'MIE': rb'~[\x10\x18]\x04.0MIE',
+    'XMP': rb'\0{0,3}(\xfe\xff|\xff\xfe|\xef\xbb\xbf)?\0{0,3}\s*<',
+    'VRD': rb'CANON OPTIONAL DATA\0',
+    'DR4': rb'IIII[\x04|\x05]\0\x04\0',
+    'IND': rb'\x06\x06\xed\xf5\xd8\x1d\x46\xe5\xbd\x31\xef\xe7\xfe\x74\xb7\x1d',
+}
+MAGIC_NUMBERS = {kind: re.compile(pattern, re.S) for kind, pattern in MAGIC_NUMBERS.items()}
+
+# ExifTool file types of each extension (%fileTypeLookup); a file passes
+# if it matches any of them. Extensions not listed are accepted on their
+# name alone.
+SIGNATURES = {}
+for _exts, _kinds in (
+        ('jpg jpeg jpe thm mpo jps insp', 'JPEG'),
+        ('tif tiff dng nef nrw cr2 arw arq sr2 srw pef erf mef mos iiq dcp gpr '
+         'rw2 rwl jxr hdp wdp', 'TIFF'),
+        ('fff', 'TIFF FLIR'),
+        ('orf ori', 'ORF'),
+        ('raw', 'RAW TIFF'),
+        ('heic heif hif avif cr3 crm mp4 m4a m4b m4p m4v mov qt 3gp 3g2 3gp2 3gpp '
+         'f4a f4b f4p f4v mqv lrv lrf glv aax 360 dvb', 'MOV'),
+        ('jp2 jpf jpx jpm jph j2k', 'JP2'),
+        ('jxl', 'JXL'),
+        ('png apng mng jng', 'PNG'),
+        ('gif', 'GIF'),
+        ('webp', 'RIFF'),
+        ('psd psb psdt cs1', 'PSD'),
+        ('pdf', 'PDF'),
+        ('ai ait', 'PDF PS'),
+        ('eps eps2 eps3 epsf', 'EPS'),
+        ('ps ps2 ps3', 'PS'),
+        ('mrw', 'MRW'),
+        ('raf', 'RAF'),
+        ('crw ciff', 'CRW'),
+        ('x3f', 'X3F'),
+        ('flif', 'FLIF'),
+        ('icc icm', 'ICC'),
+        ('pbm pgm ppm', 'PPM'),
+        ('exif', 'EXIF'),
+        ('exv', 'EXV'),
+        ('mie', 'MIE'),
+        ('xmp nksc', 'XMP'),
+        ('vrd', 'VRD'),
+        ('dr4', 'DR4'),
+        ('ind indd indt', 'IND'),
+):
+    for _ext in _exts.split():
+        SIGNATURES[_ext] = tuple(MAGIC_NUMBERS[kind] for kind in _kinds.split())
+
+# ExifTool's $testLen
+HEAD_SIZE = 1024
+
+
+def classify(path):
+    """Return None if ExifTool can write `path`, else a reason code."""
+    ext = os.path.splitext(path)[1][1:].lower()
+    if ext not in WRITABLE_EXTENSIONS:
+        return SKIP_UNSUPPORTED
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(HEAD_SIZE)
+    except OSError:
+        return SKIP_UNREADABLE
+    if not head:
+        return SKIP_EMPTY
+    sigs = SIGNATURES.get(ext)
+    if sigs and not any(magic.match(head) for magic in sigs):
+        return SKIP_MISMATCH
+    return None
+
+
+def split_writable(paths):
+    """Split `paths` into (writable paths, [(path, reason), ...])."""
+    accepted = []
+    skipped = []
+    for path in paths:
+        reason = classify(path)
+        if reason is None:
+            accepted.append(path)
+        else:
+            skipped.append((path, reason))
+    return accepted, skipped
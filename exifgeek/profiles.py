@@ -0,0 +1,59 @@
+import os
+from collections import namedtuple
+
+from .exiftool import bundled_dir
+
+# `args` follow `-TagsFromFile SRC` in the copy command
+Profile = namedtuple('Profile', ['name', 'label', 'args'])
+
+DEFAULT_PROFILE = 'full'
+
+PROFILES = [
+    Profile('full', 'All metadata', ['-all:all']),
+    Profile('exif-core', 'EXIF core', [
+        '-EXIF:DateTimeOriginal', '-EXIF:CreateDate', '-EXIF:ModifyDate',
+        '-EXIF:OffsetTime*', '-EXIF:SubSecTime*',
+        '-EXIF:Make', '-EXIF:Model', '-EXIF:LensMake', '-EXIF:LensModel', '-EXIF:SerialNumber',
+        '-EXIF:ExposureTime', '-EXIF:FNumber', '-EXIF:ISO', '-EXIF:ExposureProgram',
+        '-EXIF:ExposureCompensation', '-EXIF:MeteringMode', '-EXIF:Flash',
+        '-EXIF:FocalLength', '-EXIF:FocalLengthIn35mmFormat', '-EXIF:WhiteBalance',
+    ]),
+    Profile('capture-time', 'Capture time', [
+        '-EXIF:DateTimeOriginal', '-EXIF:CreateDate', '-EXIF:OffsetTime*', '-EXIF:SubSecTime*',
+        '-XMP-photoshop:DateCreated', '-XMP-xmp:CreateDate', '-XMP-exif:DateTimeOriginal',
+        '-QuickTime:CreateDate',
+    ]),
+    Profile('gps', 'GPS only', ['-GPS:all', '-XMP-exif:GPS*']),
+    Profile('rights', 'IPTC/XMP rights', [
+        '-EXIF:Artist', '-EXIF:Copyright',
+        '-IPTC:By-line', '-IPTC:By-lineTitle', '-IPTC:Credit', '-IPTC:Source', '-IPTC:CopyrightNotice',
+        '-XMP-dc:Creator', '-XMP-dc:Rights', '-XMP-xmpRights:all',
+        '-XMP-photoshop:Credit', '-XMP-photoshop:Source', '-XMP-iptcCore:CreatorContactInfo',
+        '-XMP-plus:all',
+    ]),
+]
+
+
+def arg_file_profiles():
+    """One profile per .args file of the bundled ExifTool (exif2xmp, ...)."""
+    base = bundled_dir()
+    directory = os.path.join(base, 'arg_files') if base else None
+    if not directory or not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext == '.args':
+            profiles.append(Profile(stem, f'{stem}.args', ['-@', os.path.join(directory, name)]))
+    return profiles
+
+
+def available_profiles():
+    return PROFILES + arg_file_profiles()
+
+
+def get_profile(name):
+    for profile in available_profiles():
+        if profile.name == name:
+            return profile
+    raise KeyError(name)
@@ -0,0 +1,99 @@
+import csv
+import json
+
+from .engine import CANCELLED, UNCHANGED
+from .exiftool import QUARANTINED
+
+STATUS_OK = 'ok'
+STATUS_WARNING = 'warning'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+STATUS_UNCHANGED = 'unchanged'
+STATUS_QUARANTINED = 'quarantined'
+
+FIELDS = ['path', 'status', 'message', 'warnings', 'elapsed', 'size']
+
+
+def result_status(result):
+    if not result.ok:
+        if result.message == CANCELLED:
+            return STATUS_CANCELLED
+        if result.message.startswith(QUARANTINED):
+            return STATUS_QUARANTINED
+        return STATUS_FAILED
+    if result.message == UNCHANGED:
+        return STATUS_UNCHANGED
+    return STATUS_WARNING if result.warnings else STATUS_OK
+
+
+def result_matches(result, status=None, text=None):
+    """True if `result` has `status` and its path, message or warnings contain `text`."""
+    if status is not None and result_status(result) != status:
+        return False
+    if text:
+        haystack = ' '.join((result.path, result.message) + tuple(result.warnings)).lower()
+        return text.lower() in haystack
+    return True
+
+
+class ResultStore:
+    """Per-file InjectionResults of the last run, for review and export."""
+
+    def __init__(self):
+        self.src = None
+        self.results = []
+
+    def start(self, src):
+        self.src = src
+        self.results = []
+
+    def add(self, results):
+        self.results.extend(results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def counts(self):
+        counts = {}
+        for result in self.results:
+            status = result_status(result)
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def filter(self, status=None, text=None):
+        return [r for r in self.results if result_matches(r, status, text)]
+
+    def slowest(self, count=10):
+        timed = [r for r in self.results if r.elapsed is not None]
+        return sorted(timed, key=lambda r: r.elapsed, reverse=True)[:count]
+
+    def rows(self):
+        for result in self.results:
+            yield {'path': result.path, 'status': result_status(result), 'message': result.message,
+                   'warnings': list(result.warnings), 'elapsed': result.elapsed, 'size': result.size}
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in self.rows():
+                row['warnings'] = '\n'.join(row['warnings'])
+                writer.writerow(row)
+
+    def export_jsonl(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in self.rows():
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def export(self, path):
+        """Write CSV, or JSON lines for a `.jsonl`/`.json` path."""
+        if path.lower().endswith(('.jsonl', '.json')):
+            self.export_jsonl(path)
+        else:
+            self.export_csv(path)
@@ -0,0 +1,41 @@
+import os
+
+
+def iter_files(paths, cancel=None):
+    """Yield files from `paths`, descending into directories lazily.
+
+    Hidden entries (starting with '.') are skipped, files and directories
+    alike; explicitly given files are passed through as-is. Symlinked
+    directories are not followed. `cancel` is an optional threading.Event
+    checked before every entry, so even a huge flat folder stops at once.
+    """
+    for path in paths:
+        if cancel is not None and cancel.is_set():
+            return
+        if not os.path.isdir(path):
+            yield path
+            continue
+        stack = [path]
+        while stack:
+            if cancel is not None and cancel.is_set():
+                return
+            top = stack.pop()
+            try:
+                it = os.scandir(top)
+            except OSError:
+                continue
+            subdirs = []
+            with it:
+                for entry in it:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+            stack.extend(reversed(subdirs))
@@ -0,0 +1,94 @@
+import os
+import json
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Groups that describe the file itself rather than copyable metadata
+FILE_GROUPS = {'System', 'File', 'Composite', 'ExifTool'}
+# Family 0 groups a MIE file can hold without loss
+MIE_GROUPS = {'EXIF', 'MakerNotes', 'XMP', 'IPTC', 'ICC_Profile', 'MIE'}
+
+
+class SnapshotCache:
+    """LRU cache of source metadata captured once into `.mie` sidecars.
+
+    Injecting from a small MIE snapshot spares ExifTool from re-parsing a
+    large source (an 80 MB RAW, say) for every batch. Entries are keyed by
+    path, size and mtime, so an edited source gets a fresh snapshot. When
+    MIE can't hold everything the source carries (JFIF, Photoshop or
+    QuickTime-only tags, ...) the original path is used instead.
+    """
+
+    def __init__(self, exiftool, max_entries=16, directory=None):
+        self.exiftool = exiftool
+        self.max_entries = max_entries
+        self.directory = directory or tempfile.mkdtemp(prefix='exifgeek-snapshots-')
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        atexit.register(self.clear)
+
+    @staticmethod
+    def key(path):
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+    def get(self, path):
+        """Return the file to use as the `-TagsFromFile` input for `path`."""
+        try:
+            key = self.key(path)
+        except OSError:
+            return path
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key] or path
+            snapshot = self._create(path, key)
+            self._entries[key] = snapshot
+            while len(self._entries) > self.max_entries:
+                _, old = self._entries.popitem(last=False)
+                self._remove(old)
+            return snapshot or path
+
+    def _create(self, path, key):
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '.mie'
+        snapshot = os.path.join(self.directory, name)
+        os.makedirs(self.directory, exist_ok=True)
+        self._remove(snapshot)
+        deadlines = self.exiftool.deadlines([path])
+        try:
+            out, _ = self.exiftool.execute('-j', '-G0', path, deadlines=deadlines)
+            if not fits_mie(json.loads(out)[0]):
+                return None
+            self.exiftool.execute('-TagsFromFile', path, '-all:all', '-icc_profile', '-o', snapshot, path,
+                                  deadlines=deadlines)
+        except Exception:
+            self._remove(snapshot)
+            return None
+        return snapshot if os.path.exists(snapshot) else None
+
+    def _remove(self, snapshot):
+        if snapshot and os.path.exists(snapshot):
+            try:
+                os.remove(snapshot)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def fits_mie(meta):
+    """Whether every copyable group in `-j -G0` output survives in MIE."""
+    for key in meta:
+        group = key.split(':', 1)[0]
+        if key == 'SourceFile' or (group in FILE_GROUPS and key != 'File:Comment'):
+            continue
+        if group not in MIE_GROUPS:
+            return False
+    return True
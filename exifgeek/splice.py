@@ -0,0 +1,190 @@
+import mmap
+import struct
+
+from .journal import temp_path
+
+SOI = b'\xff\xd8'
+SOS = 0xDA
+APP0 = 0xE0
+APP1 = 0xE1
+APP2 = 0xE2
+APP13 = 0xED
+# SOFn; C4 (DHT), C8 (JPG) and CC (DAC) share the range
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field
+STANDALONE_MARKERS = frozenset([0x01] + list(range(0xD0, 0xD8)))
+
+EXIF = 'exif'
+XMP = 'xmp'
+IPTC = 'iptc'
+XMP_EXTENSION = 'xmp-extension'
+MPF = 'mpf'
+
+# (marker, payload prefix) of the segments told apart
+SEGMENT_KINDS = (
+    (APP1, b'Exif\x00\x00', EXIF),
+    (APP1, b'http://ns.adobe.com/xap/1.0/\x00', XMP),
+    (APP1, b'http://ns.adobe.com/xmp/extension/\x00', XMP_EXTENSION),
+    (APP2, b'MPF\x00', MPF),
+    (APP13, b'Photoshop 3.0\x00', IPTC),
+)
+
+ORIENTATION = 0x0112
+EXIF_IFD = 0x8769
+PIXEL_X_DIMENSION = 0xA002
+PIXEL_Y_DIMENSION = 0xA003
+
+
+class SpliceUnsupported(ValueError):
+    """The file needs ExifTool; the message says why."""
+
+
+def read_header(buf):
+    """Segments before the scan of JPEG `buf`, as ([(marker, start, end)], SOS offset)."""
+    if buf[:2] != SOI:
+        raise SpliceUnsupported("not a JPEG")
+    segments = []
+    pos = 2
+    while True:
+        if pos + 4 > len(buf) or buf[pos] != 0xFF:
+            raise SpliceUnsupported("malformed JPEG header")
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            # Fill byte
+            pos += 1
+            continue
+        if marker == SOS:
+            return segments, pos
+        if marker in STANDALONE_MARKERS:
+            pos += 2
+            continue
+        length, = struct.unpack_from('>H', buf, pos + 2)
+        end = pos + 2 + length
+        if length < 2 or end > len(buf):
+            raise SpliceUnsupported("truncated JPEG segment")
+        segments.append((marker, pos, end))
+        pos = end
+
+
+def segment_kind(buf, marker, start):
+    for kind_marker, prefix, kind in SEGMENT_KINDS:
+        if marker == kind_marker and buf[start + 4:start + 4 + len(prefix)] == prefix:
+            return kind
+    return None
+
+
+def exif_info(segment):
+    """(Orientation, (PixelXDimension, PixelYDimension)) of an APP1 Exif segment, None where missing."""
+    tiff = segment[10:]
+    try:
+        order = {b'II': '<', b'MM': '>'}[bytes(tiff[:2])]
+        ifd0 = _ifd(tiff, order, struct.unpack_from(order + 'I', tiff, 4)[0])
+        orientation = ifd0.get(ORIENTATION)
+        size = None
+        if EXIF_IFD in ifd0:
+            exif = _ifd(tiff, order, ifd0[EXIF_IFD])
+            if PIXEL_X_DIMENSION in exif and PIXEL_Y_DIMENSION in exif:
+                size = (exif[PIXEL_X_DIMENSION], exif[PIXEL_Y_DIMENSION])
+    except (KeyError, struct.error):
+        raise SpliceUnsupported("unreadable Exif") from None
+    return orientation, size
+
+
+def _ifd(tiff, order, offset):
+    # Single-valued SHORT and LONG entries of the IFD at `offset`
+    count, = struct.unpack_from(order + 'H', tiff, offset)
+    entries = {}
+    for i in range(count):
+        tag, kind, n = struct.unpack_from(order + 'HHI', tiff, offset + 2 + 12 * i)
+        if n != 1:
+            continue
+        if kind == 3:
+            entries[tag], = struct.unpack_from(order + 'H', tiff, offset + 10 + 12 * i)
+        elif kind in (4, 13):
+            entries[tag], = struct.unpack_from(order + 'I', tiff, offset + 10 + 12 * i)
+    return entries
+
+
+def frame_size(buf, segments):
+    """(width, height) from the SOFn segment."""
+    for marker, start, end in segments:
+        if marker in SOF_MARKERS and end - start >= 9:
+            height, width = struct.unpack_from('>HH', buf, start + 5)
+            return width, height
+    raise SpliceUnsupported("no JPEG frame header")
+
+
+class SpliceSource:
+    """The Exif, XMP and IPTC segments of a JPEG source, read once per batch.
+
+    Sources ExifTool should handle (multi-picture MPF files, extended XMP
+    split over several segments, more than one Exif segment, an
+    Orientation other than normal, or no metadata at all) raise
+    SpliceUnsupported.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.segments = {}
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            segments, _ = read_header(buf)
+            for marker, start, end in segments:
+                kind = segment_kind(buf, marker, start)
+                if kind in (MPF, XMP_EXTENSION):
+                    raise SpliceUnsupported(f"{kind} segment in source")
+                if kind is None:
+                    continue
+                if kind in self.segments:
+                    raise SpliceUnsupported(f"several {kind} segments in source")
+                self.segments[kind] = buf[start:end]
+        if not self.segments:
+            raise SpliceUnsupported("no metadata segments in source")
+        self.orientation, self.size = exif_info(self.segments[EXIF]) if EXIF in self.segments else (None, None)
+        if (self.orientation or 1) != 1:
+            # Targets take it along, but their pixels were never rotated
+            raise SpliceUnsupported("source is rotated by its orientation")
+
+
+def splice_metadata(source, path):
+    """Write `path` with the metadata segments of `source` to `temp_path(path)`.
+
+    JFIF, ICC profile and the other segments of the target stay, and the
+    entropy-coded data is copied through unchanged. Only targets without
+    Exif, XMP or IPTC of their own are spliced, since ExifTool would merge
+    the source's tags into those rather than replace them; such targets,
+    MPF, or an Exif image size of the source that doesn't match the
+    target raise SpliceUnsupported.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        segments, sos = read_header(buf)
+        kept = []
+        for marker, start, end in segments:
+            kind = segment_kind(buf, marker, start)
+            if kind is not None:
+                raise SpliceUnsupported(f"{kind} segment in target")
+            kept.append((marker, start, end))
+        if source.size is not None and source.size != frame_size(buf, segments):
+            raise SpliceUnsupported("image size differs from the source")
+
+        data = memoryview(buf)
+        try:
+            with open(temp_path(path), 'wb') as out:
+                out.write(SOI)
+                # JFIF/JFXX must stay first, Exif and XMP follow them
+                while kept and kept[0][0] == APP0:
+                    _, start, end = kept.pop(0)
+                    out.write(data[start:end])
+                for kind in (EXIF, XMP):
+                    if kind in source.segments:
+                        out.write(source.segments[kind])
+                iptc = source.segments.get(IPTC)
+                for marker, start, end in kept:
+                    if iptc and not APP0 <= marker < APP13:
+                        out.write(iptc)
+                        iptc = None
+                    out.write(data[start:end])
+                if iptc:
+                    out.write(iptc)
+                out.write(data[sos:])
+        finally:
+            data.release()
@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .snapshot import FILE_GROUPS, SnapshotCache
+
+
+def data_dir():
+    """Per-user directory for ExifGeek's own state files."""
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    path = os.path.join(base, 'ExifGeek')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def source_fingerprint(exiftool, src):
+    """Hash of the copyable tags of `src`, or None if it can't be read."""
+    try:
+        out, _ = exiftool.execute('-j', '-G1', src, deadlines=exiftool.deadlines([src]))
+        meta = json.loads(out)[0]
+    except Exception:
+        return None
+    tags = {k: v for k, v in meta.items()
+            if k != 'SourceFile' and (k.split(':', 1)[0] not in FILE_GROUPS or k == 'File:Comment')}
+    return hashlib.sha256(json.dumps(tags, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class FingerprintCache:
+    """LRU of source_fingerprint() results, keyed like SnapshotCache.
+
+    A source injected from batch after batch is read once for as long as
+    its path, size and mtime stay the same. Failed reads aren't cached.
+    """
+
+    def __init__(self, exiftool, max_entries=16):
+        self.exiftool = exiftool
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, src):
+        try:
+            key = SnapshotCache.key(src)
+        except OSError:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            fingerprint = source_fingerprint(self.exiftool, src)
+            if fingerprint is not None:
+                self._entries[key] = fingerprint
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return fingerprint
+
+
+class StateDB:
+    """Remembers which source metadata each target was last written with.
+
+    Rows are keyed by target path and hold the size and mtime the file had
+    right after the write, so a target is only considered current while
+    nobody else has touched it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir(), 'state.sqlite3')
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS targets ('
+                'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, source_hash TEXT)')
+
+    def current(self, paths, source_hash):
+        """Return the subset of `paths` already written from `source_hash`."""
+        result = set()
+        with self._lock:
+            for path in paths:
+                row = self._conn.execute(
+                    'SELECT size, mtime_ns, source_hash FROM targets WHERE path = ?',
+                    (os.path.abspath(path),)).fetchone()
+                if row is None or row[2] != source_hash:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if (st.st_size, st.st_mtime_ns) == (row[0], row[1]):
+                    result.add(path)
+        return result
+
+    def record(self, paths, source_hash):
+        rows = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            rows.append((os.path.abspath(path), st.st_size, st.st_mtime_ns, source_hash))
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO targets VALUES (?, ?, ?, ?)', rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
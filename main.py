@@ -1,14 +1,30 @@
 import sys
 import json
-import subprocess
 import os
+import time
+import threading
+
+# Startup timing: import -> first paint -> ExifTool ready
+STARTUP_T0 = time.perf_counter()
+
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QLabel, QPushButton, QTextEdit, 
-                             QFileDialog, QListWidget, QListWidgetItem, QSplitter, QMessageBox,
-                             QFrame, QSizePolicy)
-from PyQt6.QtCore import Qt, QMimeData, QSize, QTimer
+                             QHBoxLayout, QLabel, QPushButton, QTableView, QHeaderView,
+                             QFileDialog, QListView, QSplitter, QMessageBox,
+                             QFrame, QSizePolicy, QSpinBox, QCheckBox, QComboBox, QStyledItemDelegate, QStyle,
+                             QDialog, QLineEdit)
+from PyQt6.QtCore import (Qt, QMimeData, QSize, QTimer, QThread, QThreadPool, QRunnable,
+                          QObject, pyqtSignal, QAbstractListModel, QAbstractTableModel, QModelIndex, QRect,
+                          QSortFilterProxyModel)
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QColor, QPalette, QFont, QIcon
 
+from exifgeek import (ExifTool, InjectionEngine, InjectionResult, SnapshotCache, StateDB, Journal, default_workers,
+                      iter_files, split_writable, available_profiles, DEFAULT_PROFILE,
+                      ResultStore, result_status, result_matches)
+from exifgeek.results import (STATUS_OK, STATUS_WARNING, STATUS_FAILED, STATUS_CANCELLED,
+                              STATUS_UNCHANGED, STATUS_QUARANTINED)
+
+STARTUP_IMPORTED = time.perf_counter()
+
 # Translations
 TRANSLATIONS = {
     'en': {
@@ -21,10 +37,48 @@ TRANSLATIONS = {
         'inject_btn': '>>> INJECT METADATA >>>',
         'clear_btn': 'CLEAR ALL',
         'ready': 'Ready',
+        'warming': 'Starting ExifTool ...',
+        'warmup_failed': 'ExifTool unavailable: {}',
         'processing': 'Processing...',
+        'progress': 'Processing... {}/{}',
         'completed': 'Completed: {}/{} files processed.',
+        'cancel_btn': '### CANCEL ###',
+        'cancelled': 'Cancelled: {}/{} files processed.',
+        'workers': 'WORKERS',
+        'only_changed': 'ONLY CHANGED',
+        'journaled': 'SAFE WRITE',
+        'splice': 'FAST JPEG',
+        'splice_tip': "JPEG to JPEG with all metadata: splice the source's Exif/XMP/IPTC segments directly into targets that have none of their own, without ExifTool. All other targets still go through ExifTool.",
+        'resume_title': 'Resume Batch',
+        'results_btn': 'RESULTS',
+        'results_title': 'Injection Results',
+        'results_count': '{} of {} files',
+        'filter_all': 'All',
+        'status_ok': 'OK',
+        'status_warning': 'Warnings',
+        'status_failed': 'Failed',
+        'status_cancelled': 'Cancelled',
+        'status_unchanged': 'Unchanged',
+        'status_quarantined': 'Quarantined',
+        'search_results': 'Filter by path or message...',
+        'export_csv': 'EXPORT CSV',
+        'export_jsonl': 'EXPORT JSONL',
+        'export_failed': 'Could not save {}:\n{}',
+        'completed_failed': 'Completed: {}/{} files processed, {} failed (see RESULTS).',
+        'resume_msg': 'An interrupted batch was found: {} of {} files are still pending or failed.\nSource: {}\n\nResume it now?',
+        'profile': 'PROFILE',
+        'profile_full': 'All metadata',
+        'profile_exif-core': 'EXIF core',
+        'profile_capture-time': 'Capture time',
+        'profile_gps': 'GPS only',
+        'profile_rights': 'IPTC/XMP rights',
         'task_complete': 'Task Complete',
         'success_msg': 'Successfully injected metadata into {} files.',
+        'loading': 'Reading metadata of {} ...',
+        'loading_full': 'Quick preview shown, reading the full metadata ...',
+        'fast_scan': 'FAST SCAN',
+        'scanning': 'Scanning... {} files found\n(click to cancel)',
+        'skipped': 'Skipped {} files ExifTool cannot write (hover for details)',
         'select_file': 'Select File',
         'select_files': 'Select Files',
         'copy_exif': 'COPY',
@@ -40,10 +94,48 @@ TRANSLATIONS = {
         'inject_btn': '>>> 注入元数据 >>>',
         'clear_btn': '清空所有',
         'ready': '就绪',
+        'warming': '正在启动 ExifTool ...',
+        'warmup_failed': 'ExifTool 不可用: {}',
         'processing': '处理中...',
+        'progress': '处理中... {}/{}',
         'completed': '完成: {}/{} 个文件已处理',
+        'cancel_btn': '### 取消 ###',
+        'cancelled': '已取消: {}/{} 个文件已处理',
+        'workers': '并发数',
+        'only_changed': '仅处理有变化的文件',
+        'journaled': '安全写入',
+        'splice': 'JPEG 快速',
+        'splice_tip': 'JPEG 到 JPEG 复制全部元数据时，对自身没有 Exif/XMP/IPTC 的目标文件，直接把源文件的这些段拼接进去，不经过 ExifTool；其他目标仍交给 ExifTool 处理。',
+        'resume_title': '继续批处理',
+        'results_btn': '结果',
+        'results_title': '注入结果',
+        'results_count': '{} / {} 个文件',
+        'filter_all': '全部',
+        'status_ok': '成功',
+        'status_warning': '有警告',
+        'status_failed': '失败',
+        'status_cancelled': '已取消',
+        'status_unchanged': '未变化',
+        'status_quarantined': '已隔离',
+        'search_results': '按路径或消息筛选...',
+        'export_csv': '导出 CSV',
+        'export_jsonl': '导出 JSONL',
+        'export_failed': '无法保存 {}：\n{}',
+        'completed_failed': '完成: {}/{} 个文件已处理，{} 个失败（详见「结果」）',
+        'resume_msg': '发现未完成的批处理：{} / {} 个文件尚未完成或失败。\n源图片: {}\n\n是否现在继续？',
+        'profile': '注入范围',
+        'profile_full': '全部元数据',
+        'profile_exif-core': 'EXIF 核心',
+        'profile_capture-time': '拍摄时间',
+        'profile_gps': '仅 GPS',
+        'profile_rights': 'IPTC/XMP 版权',
         'task_complete': '任务完成',
         'success_msg': '成功将元数据注入到 {} 个文件',
+        'loading': '正在读取 {} 的元数据 ...',
+        'loading_full': '已显示快速预览，正在读取完整元数据 ...',
+        'fast_scan': '快速扫描',
+        'scanning': '扫描中... 已找到 {} 个文件\n(点击取消)',
+        'skipped': '已跳过 {} 个 ExifTool 无法写入的文件 (悬停查看详情)',
         'select_file': '选择文件',
         'select_files': '选择文件',
         'copy_exif': '复制',
@@ -75,14 +167,30 @@ QWidget {{
     font-family: 'Monaco', 'Menlo', 'Courier New', monospace;
     font-size: 12px;
 }}
-QTextEdit {{
+QTableView {{
     background-color: {DRACULA['curr_line']};
     color: {DRACULA['green']};
     border: 1px solid {DRACULA['purple']};
     border-radius: 5px;
     padding: 10px;
+    gridline-color: {DRACULA['curr_line']};
+}}
+QHeaderView::section {{
+    background-color: {DRACULA['bg']};
+    color: {DRACULA['comment']};
+    border: none;
+    padding: 2px 6px;
+}}
+QDialog {{
+    background-color: {DRACULA['bg']};
+}}
+QLineEdit {{
+    background-color: {DRACULA['curr_line']};
+    border: 1px solid {DRACULA['comment']};
+    border-radius: 4px;
+    padding: 4px 6px;
 }}
-QListWidget {{
+QListView {{
     background-color: {DRACULA['curr_line']};
     color: {DRACULA['cyan']};
     border: 1px solid {DRACULA['comment']};
@@ -118,43 +226,6 @@ QFrame#DropZone:hover {{
 }}
 """
 
-class ExifTool:
-    @staticmethod
-    def get_cmd_prefix():
-        # Check for bundled resource in py2app
-        if 'RESOURCEPATH' in os.environ:
-            bundled_path = os.path.join(os.environ['RESOURCEPATH'], 'exiftool_src', 'exiftool')
-            if os.path.exists(bundled_path):
-                return ['perl', bundled_path]
-        return ['exiftool']
-
-    @staticmethod
-    def get_metadata(path):
-        try:
-            # Check if exiftool is available
-            cmd = ExifTool.get_cmd_prefix() + ['-j', path]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                return data[0] if data else {}
-            return {"Error": "Failed to read metadata"}
-        except FileNotFoundError:
-            return {"Error": "exiftool not found in PATH"}
-        except Exception as e:
-            return {"Error": str(e)}
-
-    @staticmethod
-    def copy_metadata(src, dest):
-        try:
-            # -overwrite_original avoids creating _original backup files
-            cmd = ExifTool.get_cmd_prefix() + ['-TagsFromFile', src, '-all:all', '-overwrite_original', dest]
-            subprocess.run(cmd, check=True, capture_output=True)
-            return True, "Success"
-        except subprocess.CalledProcessError as e:
-            return False, str(e)
-        except Exception as e:
-            return False, str(e)
-
 class DropZone(QFrame):
     def __init__(self, parent_win, is_multiple=False, text_key=''):
         super().__init__()
@@ -180,7 +251,9 @@ class DropZone(QFrame):
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            if self.is_multiple:
+            if self.is_multiple and self.parent_win.scan_threads:
+                self.parent_win.cancel_scan()
+            elif self.is_multiple:
                 title = self.parent_win.tr('select_files')
                 files, _ = QFileDialog.getOpenFileNames(self, title)
                 if files:
@@ -205,12 +278,459 @@ class DropZone(QFrame):
             else:
                 self.parent_win.handle_src_drop(files)
 
+def path_segments(path):
+    # (text, color) runs for the directory, file name and extension
+    directory, filename = os.path.split(path)
+    name, ext = os.path.splitext(filename)
+    parts = []
+    if directory:
+        parts.append((f'{directory}/', DRACULA['comment']))
+    if name:
+        parts.append((name, DRACULA['green']))
+    if ext:
+        parts.append((ext, DRACULA['purple']))
+    return parts
+
+class TargetListModel(QAbstractListModel):
+    def __init__(self):
+        super().__init__()
+        self.paths = []
+        self._seen = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole, Qt.ItemDataRole.ToolTipRole):
+            return self.paths[index.row()]
+        return None
+
+    def add_paths(self, paths):
+        # A folder dropped twice, or a file inside a dropped folder, is listed once
+        paths = [p for p in dict.fromkeys(paths) if os.path.abspath(p) not in self._seen]
+        if not paths:
+            return
+        self._seen.update(os.path.abspath(p) for p in paths)
+        start = len(self.paths)
+        self.beginInsertRows(QModelIndex(), start, start + len(paths) - 1)
+        self.paths.extend(paths)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.paths = []
+        self._seen = set()
+        self.endResetModel()
+
+class TargetPathDelegate(QStyledItemDelegate):
+    def paint(self, painter, option, index):
+        path = index.data(Qt.ItemDataRole.UserRole)
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, QColor(DRACULA['bg']))
+        rect = option.rect.adjusted(4, 0, -4, 0)
+        painter.setClipRect(rect)
+        metrics = option.fontMetrics
+        x = rect.left()
+        for text, color in path_segments(path):
+            if x >= rect.right():
+                break
+            painter.setPen(QColor(color))
+            painter.drawText(QRect(x, rect.top(), rect.right() - x, rect.height()),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+            x += metrics.horizontalAdvance(text)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(0, option.fontMetrics.height() + 8)
+
+class MetadataTableModel(QAbstractTableModel):
+    """Tag/value rows of a Metadata, formatted only when painted."""
+
+    MAX_VALUE_CHARS = 200
+    KEY_COLORS = [DRACULA["pink"], DRACULA["cyan"], DRACULA["orange"], DRACULA["green"], DRACULA["purple"]]
+    VALUE_CYCLE = [DRACULA["yellow"], DRACULA["fg"], DRACULA["green"]]
+
+    def __init__(self):
+        super().__init__()
+        self.items = []
+        self.expanded = set()
+        self._texts = {}
+
+    def set_metadata(self, meta):
+        self.beginResetModel()
+        self.items = []
+        if meta is not None:
+            if meta.error is not None:
+                self.items.append(('Error', meta.error, meta.error))
+            self.items.extend((tag.key, tag.print_value, tag.value) for tag in meta)
+        self.expanded = set()
+        self._texts = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return ('Tag', 'Value')[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        key, value, raw = self.items[row]
+        if index.column() == 0:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return key
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor(self.KEY_COLORS[row % len(self.KEY_COLORS)])
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            text = self.value_text(row)
+            if row not in self.expanded and len(text) > self.MAX_VALUE_CHARS:
+                return f'{text[:self.MAX_VALUE_CHARS]} ... (+{len(text) - self.MAX_VALUE_CHARS} chars)'
+            return text
+        if role == Qt.ItemDataRole.ToolTipRole and raw != value:
+            return str(raw) # Numeric value behind the printed one
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if isinstance(value, (int, float)):
+                return QColor(DRACULA["cyan"])
+            if isinstance(value, (list, dict)):
+                return QColor(DRACULA["orange"])
+            return QColor(self.VALUE_CYCLE[row % len(self.VALUE_CYCLE)])
+        return None
+
+    def value_text(self, row):
+        if row not in self._texts:
+            value = self.items[row][1]
+            if isinstance(value, (list, dict)):
+                self._texts[row] = json.dumps(value, ensure_ascii=False)
+            else:
+                self._texts[row] = str(value)
+        return self._texts[row]
+
+    def is_truncated(self, row):
+        return len(self.value_text(row)) > self.MAX_VALUE_CHARS
+
+    def toggle_expanded(self, row):
+        if row in self.expanded:
+            self.expanded.discard(row)
+        elif self.is_truncated(row):
+            self.expanded.add(row)
+        else:
+            return False
+        index = self.index(row, 1)
+        self.dataChanged.emit(index, index)
+        return True
+
+class MetadataSignals(QObject):
+    # token, metadata, final (False for the quick FastScan pass)
+    loaded = pyqtSignal(int, object, bool)
+
+class MetadataLoader(QRunnable):
+    def __init__(self, exiftool, path, token, signals, fast_scan=0):
+        super().__init__()
+        self.exiftool = exiftool
+        self.path = path
+        self.token = token
+        self.signals = signals
+        self.fast_scan = fast_scan
+
+    def run(self):
+        if self.fast_scan:
+            meta = self.exiftool.read_metadata(self.path, fast=self.fast_scan)
+            if meta.error is None:
+                self.signals.loaded.emit(self.token, meta, False)
+        meta = self.exiftool.read_metadata(self.path)
+        self.signals.loaded.emit(self.token, meta, True)
+
+class ScanThread(QThread):
+    # Writable paths and (path, reason) pairs for the files left out
+    found = pyqtSignal(list, list)
+
+    BATCH_SIZE = 1000
+    BATCH_INTERVAL = 0.1
+
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = paths
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        batch = []
+        last = time.monotonic()
+        for path in iter_files(self.paths, self._cancel):
+            batch.append(path)
+            now = time.monotonic()
+            if len(batch) >= self.BATCH_SIZE or now - last >= self.BATCH_INTERVAL:
+                if self._cancel.is_set():
+                    return
+                self.found.emit(*split_writable(batch))
+                batch = []
+                last = now
+        if batch and not self._cancel.is_set():
+            self.found.emit(*split_writable(batch))
+
+class InjectionThread(QThread):
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(list)
+
+    def __init__(self, engine, src, targets, resume=False):
+        super().__init__()
+        self.engine = engine
+        self.src = src
+        self.targets = targets
+        self.resume = resume
+
+    def run(self):
+        progress = lambda done, total, result: self.progress.emit(done, total)
+        try:
+            if self.resume:
+                results = self.engine.resume(progress=progress)
+            else:
+                results = self.engine.run(self.src, self.targets, progress=progress)
+        except Exception as e:
+            # A locked state DB, an unwritable journal, ... must still
+            # hand the window back instead of leaving it processing
+            if self.resume and self.engine.journal is not None:
+                # Or every launch would offer the same failing resume
+                try:
+                    self.engine.journal.clear()
+                except OSError:
+                    pass
+            message = f"{type(e).__name__}: {e}"
+            results = [InjectionResult(path, False, message) for path in self.targets]
+        self.done.emit(results)
+
+class WarmupThread(QThread):
+    # Error message, or None once every ExifTool session answered
+    ready = pyqtSignal(object)
+
+    def __init__(self, exiftool):
+        super().__init__()
+        self.exiftool = exiftool
+
+    def run(self):
+        try:
+            self.exiftool.warm()
+        except Exception as e:
+            self.ready.emit(str(e))
+            return
+        self.ready.emit(None)
+
+class ResultsTableModel(QAbstractTableModel):
+    """Rows of a ResultStore; UserRole holds the sort key of each column."""
+
+    COLUMNS = ('Status', 'File', 'Time (ms)', 'Size', 'Message')
+    STATUS_COLORS = {
+        STATUS_OK: DRACULA["green"],
+        STATUS_WARNING: DRACULA["orange"],
+        STATUS_FAILED: DRACULA["red"],
+        STATUS_CANCELLED: DRACULA["comment"],
+        STATUS_UNCHANGED: DRACULA["cyan"],
+        STATUS_QUARANTINED: DRACULA["pink"],
+    }
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.statuses = []
+
+    def refresh(self):
+        self.beginResetModel()
+        self.statuses = [result_status(r) for r in self.store]
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.statuses)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        result = self.store[index.row()]
+        status = self.statuses[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return status
+            if column == 1:
+                return result.path
+            if column == 2:
+                return '' if result.elapsed is None else f'{result.elapsed * 1000:.0f}'
+            if column == 3:
+                return '' if result.size is None else str(result.size)
+            return ' | '.join((result.message,) + tuple(result.warnings))
+        if role == Qt.ItemDataRole.UserRole:
+            keys = (status, result.path, -1 if result.elapsed is None else result.elapsed,
+                    -1 if result.size is None else result.size, result.message)
+            return keys[column]
+        if role == Qt.ItemDataRole.ToolTipRole and column in (1, 4):
+            return '\n'.join((result.path, result.message) + tuple(result.warnings))
+        if role == Qt.ItemDataRole.ForegroundRole and column == 0:
+            return QColor(self.STATUS_COLORS[status])
+        return None
+
+class ResultsFilterModel(QSortFilterProxyModel):
+    def __init__(self):
+        super().__init__()
+        self.status = None
+        self.text = ''
+        self.setSortRole(Qt.ItemDataRole.UserRole)
+
+    def set_filter(self, status, text):
+        self.status = status
+        self.text = text
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, row, parent):
+        model = self.sourceModel()
+        return result_matches(model.store[row], self.status, self.text)
+
+class ResultsDialog(QDialog):
+    """Per-file results of the last run, filterable, sortable and exportable."""
+
+    STATUSES = [None, STATUS_FAILED, STATUS_QUARANTINED, STATUS_WARNING, STATUS_OK, STATUS_UNCHANGED,
+                STATUS_CANCELLED]
+
+    def __init__(self, parent, store):
+        super().__init__(parent)
+        self.win = parent
+        self.store = store
+        self.resize(900, 500)
+        
+        self.model = ResultsTableModel(store)
+        self.proxy = ResultsFilterModel()
+        self.proxy.setSourceModel(self.model)
+        
+        layout = QVBoxLayout(self)
+        filter_layout = QHBoxLayout()
+        self.status_combo = QComboBox()
+        for status in self.STATUSES:
+            self.status_combo.addItem('', status)
+        self.status_combo.currentIndexChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.status_combo)
+        self.search = QLineEdit()
+        self.search.textChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.search, 1)
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet(f"color: {DRACULA['comment']};")
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
+        
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.setShowGrid(False)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setDefaultSectionSize(self.table.fontMetrics().height() + 6)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        for column, width in enumerate((80, 320, 80, 80)):
+            self.table.setColumnWidth(column, width)
+        layout.addWidget(self.table)
+        
+        export_layout = QHBoxLayout()
+        export_layout.addStretch(1)
+        self.btn_csv = QPushButton()
+        self.btn_csv.clicked.connect(lambda: self.export('csv'))
+        export_layout.addWidget(self.btn_csv)
+        self.btn_jsonl = QPushButton()
+        self.btn_jsonl.clicked.connect(lambda: self.export('jsonl'))
+        export_layout.addWidget(self.btn_jsonl)
+        layout.addLayout(export_layout)
+        
+        self.update_text()
+
+    def update_text(self):
+        self.setWindowTitle(self.win.tr('results_title'))
+        for i, status in enumerate(self.STATUSES):
+            self.status_combo.setItemText(i, self.win.tr(f'status_{status}' if status else 'filter_all'))
+        self.search.setPlaceholderText(self.win.tr('search_results'))
+        self.btn_csv.setText(self.win.tr('export_csv'))
+        self.btn_jsonl.setText(self.win.tr('export_jsonl'))
+        self.update_count()
+
+    def refresh(self, status=None):
+        self.model.refresh()
+        self.status_combo.setCurrentIndex(self.STATUSES.index(status))
+        self.apply_filter()
+
+    def apply_filter(self):
+        self.proxy.set_filter(self.status_combo.currentData(), self.search.text())
+        self.update_count()
+
+    def update_count(self):
+        self.count_label.setText(self.win.tr('results_count').format(self.proxy.rowCount(), len(self.store)))
+
+    def export(self, kind):
+        fname, _ = QFileDialog.getSaveFileName(self, self.win.tr(f'export_{kind}'), f"results.{kind}")
+        if fname:
+            try:
+                if kind == 'csv':
+                    self.store.export_csv(fname)
+                else:
+                    self.store.export_jsonl(fname)
+            except Exception as e:
+                QMessageBox.warning(self, self.win.tr(f'export_{kind}'),
+                                    self.win.tr('export_failed').format(fname, e))
+
 class MainWindow(QMainWindow):
+    SKIPPED_TOOLTIP_LINES = 50
+    FAST_SCAN_LEVEL = 2
+
     def __init__(self):
         super().__init__()
         self.curr_lang = 'zh'
         self.setWindowTitle("ExifGeek")
         self.resize(1000, 700)
+        self.startup = {'import': STARTUP_IMPORTED - STARTUP_T0}
+        self.exiftool = ExifTool(size=default_workers())
+        # Perl startup of every session overlaps building and painting the
+        # window; None until the warmup read is done, then '' or the error
+        self.exiftool_error = None
+        self.warmup_thread = WarmupThread(self.exiftool)
+        self.warmup_thread.ready.connect(self.on_exiftool_ready)
+        self.warmup_thread.start()
+        self.snapshots = SnapshotCache(self.exiftool)
+        self.state = StateDB()
+        # Every batch is checkpointed so it can be resumed after a crash or quit
+        self.journal = Journal()
+        self.engine = InjectionEngine(self.exiftool, workers=default_workers(),
+                                      snapshots=self.snapshots, state=self.state, journal=self.journal)
+        self.injection_thread = None
+        self.results = ResultStore()
+        self.results_dialog = None
+        
+        # Source reads run on a thread pool; the token drops results for
+        # a source that has been replaced in the meantime
+        self.read_pool = QThreadPool()
+        self.src_token = 0
+        self.current_meta = None
+        self.meta_signals = MetadataSignals()
+        self.meta_signals.loaded.connect(self.on_src_loaded)
+        
+        self.scan_threads = []
+        # Scans cancelled by CLEAR ALL, kept referenced until they wind down
+        self.stopping_scans = []
+        self.scan_found = 0
+        self.skipped = []
         
         # Apply Stylesheet
         self.setStyleSheet(STYLESHEET)
@@ -310,10 +830,38 @@ class MainWindow(QMainWindow):
         self.btn_copy_src.setStyleSheet(copy_style)
         self.btn_save_src.setStyleSheet(save_style)
 
-        self.src_info = QTextEdit()
-        self.src_info.setReadOnly(True)
+        self.src_status = QLabel()
+        self.src_status.setStyleSheet(f"color: {DRACULA['comment']};")
+        self.src_status.setWordWrap(True)
+        src_layout.addWidget(self.src_status)
+        
+        # Rows are formatted as they scroll into view; double-click a
+        # truncated value to expand it
+        self.src_model = MetadataTableModel()
+        self.src_info = QTableView()
+        self.src_info.setModel(self.src_model)
+        self.src_info.setWordWrap(True)
+        self.src_info.setShowGrid(False)
+        self.src_info.verticalHeader().hide()
+        self.src_info.verticalHeader().setDefaultSectionSize(self.src_info.fontMetrics().height() + 6)
+        self.src_info.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        self.src_info.horizontalHeader().setStretchLastSection(True)
+        self.src_info.setColumnWidth(0, 200)
+        self.src_info.doubleClicked.connect(self.toggle_src_value)
         src_layout.addWidget(self.src_info)
         
+        # FastScan level of the quick first preview pass (0 reads in one go)
+        fast_layout = QHBoxLayout()
+        self.fast_scan_label = QLabel()
+        self.fast_scan_label.setStyleSheet(f"color: {DRACULA['comment']};")
+        self.fast_scan_spin = QSpinBox()
+        self.fast_scan_spin.setRange(0, 5)
+        self.fast_scan_spin.setValue(self.FAST_SCAN_LEVEL)
+        fast_layout.addStretch()
+        fast_layout.addWidget(self.fast_scan_label)
+        fast_layout.addWidget(self.fast_scan_spin)
+        src_layout.addLayout(fast_layout)
+        
         self.src_path = None
         
         splitter.addWidget(src_widget)
@@ -330,9 +878,45 @@ class MainWindow(QMainWindow):
         self.tgt_drop.setFixedHeight(100)
         tgt_layout.addWidget(self.tgt_drop)
         
-        self.tgt_list = QListWidget()
+        # Only visible rows are painted, so the list copes with huge batches
+        self.tgt_model = TargetListModel()
+        self.tgt_list = QListView()
+        self.tgt_list.setModel(self.tgt_model)
+        self.tgt_list.setItemDelegate(TargetPathDelegate(self.tgt_list))
+        self.tgt_list.setUniformItemSizes(True)
         tgt_layout.addWidget(self.tgt_list)
         
+        workers_layout = QHBoxLayout()
+        self.profile_label = QLabel()
+        self.profile_label.setStyleSheet(f"color: {DRACULA['comment']};")
+        self.profile_combo = QComboBox()
+        self.profiles = available_profiles()
+        for profile in self.profiles:
+            self.profile_combo.addItem(profile.label, profile.name)
+        self.profile_combo.setCurrentIndex(self.profile_combo.findData(DEFAULT_PROFILE))
+        self.profile_combo.currentIndexChanged.connect(self.set_profile)
+        workers_layout.addWidget(self.profile_label)
+        workers_layout.addWidget(self.profile_combo)
+        self.only_changed_check = QCheckBox()
+        self.only_changed_check.toggled.connect(self.set_only_changed)
+        workers_layout.addWidget(self.only_changed_check)
+        self.journaled_check = QCheckBox()
+        self.journaled_check.toggled.connect(self.set_journaled)
+        workers_layout.addWidget(self.journaled_check)
+        self.splice_check = QCheckBox()
+        self.splice_check.toggled.connect(self.set_splice)
+        workers_layout.addWidget(self.splice_check)
+        self.workers_label = QLabel()
+        self.workers_label.setStyleSheet(f"color: {DRACULA['comment']};")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(64, default_workers()))
+        self.workers_spin.setValue(self.engine.workers)
+        self.workers_spin.valueChanged.connect(self.set_workers)
+        workers_layout.addStretch()
+        workers_layout.addWidget(self.workers_label)
+        workers_layout.addWidget(self.workers_spin)
+        tgt_layout.addLayout(workers_layout)
+        
         splitter.addWidget(tgt_widget)
         
         main_layout.addWidget(splitter)
@@ -341,7 +925,7 @@ class MainWindow(QMainWindow):
         action_layout = QHBoxLayout()
         
         self.btn_copy = QPushButton()
-        self.btn_copy.clicked.connect(self.run_injection)
+        self.btn_copy.clicked.connect(lambda: self.run_injection())
         self.btn_copy.setEnabled(False)
         self.btn_copy.setMinimumHeight(40)
         self.btn_copy.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
@@ -371,6 +955,23 @@ class MainWindow(QMainWindow):
         """)
         self.btn_clear.clicked.connect(self.clear_all)
         
+        self.btn_results = QPushButton()
+        self.btn_results.setMinimumHeight(32)
+        self.btn_results.setEnabled(False)
+        self.btn_results.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {DRACULA['yellow']};
+                color: {DRACULA['bg']};
+                font-size: 14px;
+                padding: 10px 15px;
+            }}
+            QPushButton:disabled {{
+                background-color: {DRACULA['curr_line']};
+                color: {DRACULA['comment']};
+            }}
+        """)
+        self.btn_results.clicked.connect(lambda: self.show_results())
+        
         left_actions_widget = QWidget()
         left_actions_layout = QVBoxLayout(left_actions_widget)
         left_actions_layout.setContentsMargins(0, 0, 0, 0)
@@ -382,7 +983,11 @@ class MainWindow(QMainWindow):
         top_src_actions.addWidget(self.btn_save_src)
         
         left_actions_layout.addLayout(top_src_actions)
-        left_actions_layout.addWidget(self.btn_clear)
+        bottom_src_actions = QHBoxLayout()
+        bottom_src_actions.setSpacing(6)
+        bottom_src_actions.addWidget(self.btn_clear, 1)
+        bottom_src_actions.addWidget(self.btn_results)
+        left_actions_layout.addLayout(bottom_src_actions)
         
         left_actions_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
         
@@ -401,6 +1006,9 @@ class MainWindow(QMainWindow):
         
         # Initialize Text
         self.update_ui_text()
+        
+        # Offer to finish a batch a crash or quit left behind, once the window is up
+        QTimer.singleShot(0, self.offer_resume)
 
     def tr(self, key):
         return TRANSLATIONS[self.curr_lang].get(key, key)
@@ -423,9 +1031,23 @@ class MainWindow(QMainWindow):
         self.header_label.setText(self.tr('title'))
         self.src_label_title.setText(self.tr('source_title'))
         self.tgt_label_title.setText(self.tr('target_title'))
-        self.src_info.setPlaceholderText(self.tr('src_placeholder'))
-        self.btn_copy.setText(self.tr('inject_btn'))
+        if not self.src_path:
+            self.src_status.setText(self.tr('src_placeholder'))
+        self.btn_copy.setText(self.tr('cancel_btn') if self.injection_thread else self.tr('inject_btn'))
+        self.workers_label.setText(self.tr('workers'))
+        self.only_changed_check.setText(self.tr('only_changed'))
+        self.journaled_check.setText(self.tr('journaled'))
+        self.splice_check.setText(self.tr('splice'))
+        self.splice_check.setToolTip(self.tr('splice_tip'))
+        self.profile_label.setText(self.tr('profile'))
+        for i, profile in enumerate(self.profiles):
+            key = f'profile_{profile.name}'
+            self.profile_combo.setItemText(i, self.tr(key) if key in TRANSLATIONS[self.curr_lang] else profile.label)
+        self.fast_scan_label.setText(self.tr('fast_scan'))
         self.btn_clear.setText(self.tr('clear_btn'))
+        self.btn_results.setText(self.tr('results_btn'))
+        if self.results_dialog:
+            self.results_dialog.update_text()
         self.btn_copy_src.setText(self.tr('copy_exif'))
         self.btn_save_src.setText(self.tr('save_exif'))
         self.update_lang_buttons()
@@ -433,139 +1055,286 @@ class MainWindow(QMainWindow):
         # Update DropZones if they don't have files
         if not self.src_path:
             self.src_drop.update_text()
-        self.tgt_drop.update_text()
+        self.update_scan_text()
         
-        if not self.src_path and self.tgt_list.count() == 0:
-            self.status_label.setText(self.tr('ready'))
+        if not self.src_path and self.tgt_model.rowCount() == 0:
+            self.status_label.setText(self.idle_status())
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if 'first_paint' not in self.startup:
+            self.mark_startup('first_paint')
+
+    def on_exiftool_ready(self, error):
+        was_idle = self.status_label.text() == self.idle_status()
+        self.exiftool_error = error or ''
+        if was_idle:
+            self.status_label.setText(self.idle_status())
+        self.mark_startup('exiftool_ready')
+
+    def idle_status(self):
+        if self.exiftool_error is None:
+            return self.tr('warming')
+        if self.exiftool_error:
+            return self.tr('warmup_failed').format(self.exiftool_error)
+        return self.tr('ready')
+
+    def mark_startup(self, name):
+        self.startup[name] = time.perf_counter() - STARTUP_T0
+        if len(self.startup) < 3 or not os.environ.get('EXIFGEEK_STARTUP_BENCH'):
+            return
+        # One JSON line per launch, then quit, so runs can be tracked
+        print(json.dumps({k: round(v, 4) for k, v in self.startup.items()}), flush=True)
+        QTimer.singleShot(0, QApplication.quit)
 
     def handle_src_drop(self, files):
         if not files: return
         self.src_path = files[0]
         self.src_drop.update_text(os.path.basename(self.src_path))
         
-        # Get Metadata
-        meta = ExifTool.get_metadata(self.src_path)
-        self.current_meta = meta # Store for copy/save
-        
-        html = self.format_exif_html(meta)
-        self.src_info.setHtml(html)
+        # Get Metadata in the background
+        self.src_token += 1
+        self.current_meta = None
+        self.src_model.set_metadata(None)
+        self.src_status.setText(self.tr('loading').format(os.path.basename(self.src_path)))
+        self.read_pool.start(MetadataLoader(self.exiftool, self.src_path, self.src_token, self.meta_signals,
+                                            fast_scan=self.fast_scan_spin.value()))
         self.check_ready()
 
-    def format_exif_html(self, data):
-        html = f'<div style="font-family: monospace; line-height: 1.4;">'
-        html += f'<span style="color: {DRACULA["fg"]}">{{</span><br>'
-        
-        key_colors = [DRACULA["pink"], DRACULA["cyan"], DRACULA["orange"], DRACULA["green"], DRACULA["purple"]]
-        value_cycle = [DRACULA["yellow"], DRACULA["fg"], DRACULA["green"]]
-        idx = 0
-        
-        for key, value in data.items():
-            val_str = str(value).replace('<', '&lt;').replace('>', '&gt;')
-            key_color = key_colors[idx % len(key_colors)]
-            if isinstance(value, (int, float)):
-                val_color = DRACULA["cyan"]
-            elif isinstance(value, (list, dict)):
-                val_color = DRACULA["orange"]
-                val_str = json.dumps(value, ensure_ascii=False)
+    def on_src_loaded(self, token, meta, final):
+        if token != self.src_token:
+            return
+        self.current_meta = meta # Store for copy/save
+        self.src_model.set_metadata(meta)
+        self.src_status.setText('' if final else self.tr('loading_full'))
+
+    def toggle_src_value(self, index):
+        row = index.row()
+        if self.src_model.toggle_expanded(row):
+            if row in self.src_model.expanded:
+                self.src_info.resizeRowToContents(row)
             else:
-                val_color = value_cycle[idx % len(value_cycle)]
-            html += f'&nbsp;&nbsp;<span style="color: {key_color}">{key}</span>: '
-            html += f'<span style="color: {val_color}">{val_str}</span><span style="color: {DRACULA["fg"]}">,</span><br>'
-            idx += 1
-            
-        html += f'<span style="color: {DRACULA["fg"]}">}}</span>'
-        html += "</div>"
-        return html
+                self.src_info.setRowHeight(row, self.src_info.verticalHeader().defaultSectionSize())
 
     def copy_src_info(self):
-        if hasattr(self, 'current_meta') and self.current_meta:
+        if self.current_meta:
             clipboard = QApplication.clipboard()
-            clipboard.setText(json.dumps(self.current_meta, indent=2))
+            clipboard.setText(json.dumps(self.current_meta.to_dict(), indent=2))
             
     def save_src_info(self):
-        if hasattr(self, 'current_meta') and self.current_meta:
+        if self.current_meta:
             fname, _ = QFileDialog.getSaveFileName(self, self.tr('save_exif'), "exif.txt")
             if fname:
                 try:
                     with open(fname, 'w', encoding='utf-8') as f:
-                        f.write(json.dumps(self.current_meta, indent=2, ensure_ascii=False))
+                        f.write(json.dumps(self.current_meta.to_dict(), indent=2, ensure_ascii=False))
                 except Exception as e:
                     print(f"Error saving: {e}")
 
     def handle_tgt_drop(self, files):
-        for f in files:
-            # Check if directory
-            if os.path.isdir(f):
-                for root, dirs, filenames in os.walk(f):
-                    for name in filenames:
-                        if not name.startswith('.'): # Ignore hidden files
-                            self.add_target_item(os.path.join(root, name))
-            else:
-                self.add_target_item(f)
+        # Folders are walked on a background thread and streamed in batches
+        if not self.scan_threads:
+            self.scan_found = 0
+        thread = ScanThread(files)
+        thread.found.connect(lambda paths, skipped: self.on_scan_batch(thread, paths, skipped))
+        thread.finished.connect(lambda: self.on_scan_finished(thread))
+        self.scan_threads.append(thread)
+        self.update_scan_text()
+        self.check_ready()
+        thread.start()
+
+    def on_scan_batch(self, thread, paths, skipped):
+        if thread not in self.scan_threads:
+            return # Batch queued before the list was cleared
+        self.tgt_model.add_paths(paths)
+        self.scan_found += len(paths)
+        self.update_scan_text()
+        if skipped:
+            self.skipped.extend(skipped)
+            self.update_skipped_text()
+
+    def update_skipped_text(self):
+        if not self.skipped:
+            self.status_label.setToolTip('')
+            return
+        self.status_label.setText(self.tr('skipped').format(len(self.skipped)))
+        lines = [f'[{reason}] {path}' for path, reason in self.skipped[:self.SKIPPED_TOOLTIP_LINES]]
+        if len(self.skipped) > self.SKIPPED_TOOLTIP_LINES:
+            lines.append('...')
+        self.status_label.setToolTip('\n'.join(lines))
+
+    def on_scan_finished(self, thread):
+        if thread in self.stopping_scans:
+            thread.wait()
+            self.stopping_scans.remove(thread)
+            return
+        if thread not in self.scan_threads:
+            return
+        thread.wait()
+        self.scan_threads.remove(thread)
+        self.update_scan_text()
         self.check_ready()
 
-    def format_path_html(self, path):
-        directory, filename = os.path.split(path)
-        name, ext = os.path.splitext(filename)
-        parts = ['<div style="font-family: monospace;">']
-        if directory:
-            parts.append(f'<span style="color:{DRACULA["comment"]}">{directory}/</span>')
-        if name:
-            parts.append(f'<span style="color:{DRACULA["green"]}">{name}</span>')
-        if ext:
-            parts.append(f'<span style="color:{DRACULA["purple"]}">{ext}</span>')
-        parts.append('</div>')
-        return ''.join(parts)
-
-    def add_target_item(self, path):
-        item = QListWidgetItem()
-        item.setData(Qt.ItemDataRole.UserRole, path)
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(4, 0, 4, 0)
-        label = QLabel()
-        label.setTextFormat(Qt.TextFormat.RichText)
-        label.setText(self.format_path_html(path))
-        layout.addWidget(label)
-        item.setSizeHint(widget.sizeHint())
-        self.tgt_list.addItem(item)
-        self.tgt_list.setItemWidget(item, widget)
+    def cancel_scan(self):
+        for thread in self.scan_threads:
+            thread.cancel()
+
+    def update_scan_text(self):
+        if self.scan_threads:
+            self.tgt_drop.update_text(self.tr('scanning').format(self.scan_found))
+        else:
+            self.tgt_drop.update_text()
+
+    def set_workers(self, n):
+        self.engine.workers = n
+        self.exiftool.resize(n)
+
+    def set_profile(self, index):
+        self.engine.profile = self.profile_combo.itemData(index)
+
+    def set_only_changed(self, checked):
+        self.engine.only_changed = checked
+
+    def set_journaled(self, checked):
+        self.engine.safe_write = checked
+
+    def set_splice(self, checked):
+        self.engine.splice = checked
 
     def check_ready(self):
-        if self.src_path and self.tgt_list.count() > 0:
+        if self.injection_thread:
+            return
+        if self.scan_threads:
+            self.btn_copy.setEnabled(False)
+            return
+        if self.src_path and self.tgt_model.rowCount() > 0:
             self.btn_copy.setEnabled(True)
         else:
             self.btn_copy.setEnabled(False)
 
     def clear_all(self):
+        # Cancelled scans finish in the background rather than blocking the
+        # window; on_scan_batch() ignores what they still send
+        self.cancel_scan()
+        self.stopping_scans.extend(self.scan_threads)
+        self.scan_threads = []
+        self.update_scan_text()
         self.src_path = None
+        self.src_token += 1
+        self.current_meta = None
         self.src_drop.update_text() # Reset to default text
-        self.src_info.clear()
-        self.tgt_list.clear()
+        self.src_model.set_metadata(None)
+        self.src_status.setText(self.tr('src_placeholder'))
+        self.tgt_model.clear()
+        # Quarantined files get another chance in the next batch
+        self.exiftool.quarantine.clear()
+        self.skipped = []
+        self.update_skipped_text()
         self.btn_copy.setEnabled(False)
-        self.status_label.setText(self.tr('ready'))
+        self.status_label.setText(self.idle_status())
+
+    def offer_resume(self):
+        batch, remaining = self.journal.pending()
+        if batch is None:
+            return
+        if not remaining or not os.path.isfile(batch['src']):
+            self.journal.clear()
+            return
+        answer = QMessageBox.question(
+            self, self.tr('resume_title'),
+            self.tr('resume_msg').format(len(remaining), len(batch['targets']), batch['src']))
+        if answer != QMessageBox.StandardButton.Yes:
+            self.journal.clear()
+            return
+        # Show the batch as it will run; resume() itself reloads it from the journal
+        self.handle_src_drop([batch['src']])
+        self.tgt_model.add_paths(remaining)
+        index = self.profile_combo.findData(batch['profile'])
+        if index >= 0:
+            self.profile_combo.setCurrentIndex(index)
+        self.journaled_check.setChecked(batch.get('safe_write', False))
+        self.run_injection(resume=True)
 
-    def run_injection(self):
+    def run_injection(self, resume=False):
+        if self.injection_thread:
+            self.engine.cancel()
+            self.btn_copy.setEnabled(False)
+            return
         if not self.src_path: return
         
-        count = self.tgt_list.count()
-        success_count = 0
+        targets = list(self.tgt_model.paths)
         
         self.status_label.setText(self.tr('processing'))
-        QApplication.processEvents()
-        
-        for i in range(count):
-            item = self.tgt_list.item(i)
-            dest_path = item.data(Qt.ItemDataRole.UserRole) or item.text()
-            ok, msg = ExifTool.copy_metadata(self.src_path, dest_path)
-            if ok:
-                success_count += 1
-            else:
-                print(f"Failed for {dest_path}: {msg}")
-                
+        self.btn_copy.setText(self.tr('cancel_btn'))
+        self.btn_clear.setEnabled(False)
+        self.workers_spin.setEnabled(False)
+        self.only_changed_check.setEnabled(False)
+        self.journaled_check.setEnabled(False)
+        self.splice_check.setEnabled(False)
+        self.profile_combo.setEnabled(False)
+        
+        self.results.start(self.src_path)
+        self.injection_thread = InjectionThread(self.engine, self.src_path, targets, resume)
+        self.injection_thread.progress.connect(self.on_injection_progress)
+        self.injection_thread.done.connect(self.on_injection_done)
+        self.injection_thread.start()
+
+    def on_injection_progress(self, done, total):
+        self.status_label.setText(self.tr('progress').format(done, total))
+
+    def on_injection_done(self, results):
+        self.injection_thread.wait()
+        self.injection_thread = None
+        self.btn_copy.setText(self.tr('inject_btn'))
+        self.btn_clear.setEnabled(True)
+        self.workers_spin.setEnabled(True)
+        self.only_changed_check.setEnabled(True)
+        self.journaled_check.setEnabled(True)
+        self.splice_check.setEnabled(True)
+        self.profile_combo.setEnabled(True)
+        self.check_ready()
+        
+        self.results.add(results)
+        self.btn_results.setEnabled(True)
+        if self.results_dialog:
+            self.results_dialog.refresh()
+        
+        count = len(results)
+        success_count = sum(1 for r in results if r.ok)
+        
+        if self.engine.cancelled:
+            self.status_label.setText(self.tr('cancelled').format(success_count, count))
+            return
+        if success_count < count:
+            self.status_label.setText(self.tr('completed_failed').format(success_count, count, count - success_count))
+            failed = self.results.counts().get(STATUS_FAILED)
+            self.show_results(STATUS_FAILED if failed else STATUS_QUARANTINED)
+            return
         self.status_label.setText(self.tr('completed').format(success_count, count))
         QMessageBox.information(self, self.tr('task_complete'), self.tr('success_msg').format(success_count))
 
+    def show_results(self, status=None):
+        if self.results_dialog is None:
+            self.results_dialog = ResultsDialog(self, self.results)
+        self.results_dialog.refresh(status)
+        self.results_dialog.show()
+        self.results_dialog.raise_()
+
+    def closeEvent(self, event):
+        if self.injection_thread:
+            self.engine.cancel()
+            self.injection_thread.wait()
+        self.cancel_scan()
+        for thread in self.scan_threads + self.stopping_scans:
+            thread.wait()
+        self.read_pool.waitForDone()
+        self.warmup_thread.wait()
+        self.exiftool.close()
+        self.snapshots.clear()
+        self.state.close()
+        self.journal.close()
+        super().closeEvent(event)
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     window = MainWindow()
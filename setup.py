@@ -4,7 +4,7 @@ APP = ['main.py']
 DATA_FILES = ['exiftool_src']
 OPTIONS = {
     'argv_emulation': True,
-    'packages': ['PyQt6'],
+    'packages': ['PyQt6', 'exifgeek'],
     'iconfile': 'icon.icns',
     'plist': {
         'CFBundleName': 'ExifGeek',